@@ -0,0 +1,275 @@
+"""
+Aproximación analítica de colas (Erlang-C / Erlang-A) para descartar configuraciones sin simular
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+from config import ConfiguracionSimulacion, ConfiguracionCajas, TipoCaja
+
+
+# Umbrales de productos usados por PoliticaAsignacion
+UMBRAL_PRIORIDAD_RAPIDA = 10
+UMBRAL_PREFERIR_HUMANA = 20
+UMBRAL_BALANCEADA_HUMANA = 25
+
+# Factor medio de inexperiencia en cajas automáticas (uniforme entre 1.0 y 1.5)
+FACTOR_INEXPERIENCIA_MEDIO = 1.25
+
+# Tope de estados de cola al sumar la distribución de Erlang-A
+MAX_ESTADOS_COLA = 100_000
+
+
+@dataclass
+class AproximacionTipo:
+    """Medidas de M/M/c+M para las cajas de un tipo"""
+    cajas: int
+    tasa_llegada: float  # clientes/minuto
+    tiempo_servicio: float  # minutos (media)
+    utilizacion: float  # fracción del tiempo ocupada (0-1)
+    prob_espera: float
+    espera_promedio: float  # minutos, de los clientes atendidos del tipo
+    prob_abandono: float
+
+
+@dataclass
+class AproximacionAnalitica:
+    """Medidas aproximadas de toda la configuración"""
+    por_tipo: Dict[TipoCaja, AproximacionTipo]
+    tasa_abandono: float  # % de clientes (incluye los que no encuentran caja)
+    tiempo_espera_promedio: float  # minutos, de los clientes atendidos (como la simulación)
+    carga_ofrecida: float  # λ·E[S] / cajas: > 1 indica sobrecarga sin abandonos
+    sin_caja: float  # fracción de clientes que ningún tipo puede atender
+
+
+def _pesos_sin_cola(carga: float, servidores: int) -> np.ndarray:
+    """Pesos sin normalizar de los estados con 0..c clientes (sin nadie en cola)"""
+    n = np.arange(servidores + 1)
+    log_base = n * math.log(carga) - np.array([math.lgamma(k + 1) for k in n])
+    return np.exp(log_base - log_base.max())
+
+
+def _pesos_cola(pi_c: float, tasa_llegada: float, capacidad: float, tasa_abandono: float) -> np.ndarray:
+    """Pesos sin normalizar de los estados con 1, 2, ... clientes en cola (tasa_abandono > 0)
+    
+    En la cola los abandonos crecen como k·θ, así que la cola truncada basta
+    con unas pocas veces λ/θ estados.
+    """
+    estados = min(int(4 * tasa_llegada / tasa_abandono) + 100, MAX_ESTADOS_COLA)
+    k = np.arange(1, estados + 1)
+    return pi_c * np.exp(np.cumsum(np.log(tasa_llegada / (capacidad + k * tasa_abandono))))
+
+
+def erlang_a(
+    tasa_llegada: float,
+    tasa_servicio: float,
+    servidores: int,
+    tasa_abandono: float
+) -> Tuple[float, float, float]:
+    """P(esperar), cola promedio y P(abandonar) de M/M/c+M (Erlang-C si tasa_abandono = 0)
+    
+    Suma directamente la distribución estacionaria del proceso de nacimiento
+    y muerte.
+    """
+    if tasa_llegada <= 0:
+        return 0.0, 0.0, 0.0
+    if servidores <= 0:
+        return 1.0, math.inf, 1.0
+    
+    base = _pesos_sin_cola(tasa_llegada / tasa_servicio, servidores)
+    pi_c = base[-1]
+    capacidad = servidores * tasa_servicio
+    
+    if tasa_abandono <= 0:
+        # Erlang-C: cola geométrica, solo estable con λ < c·μ
+        r = tasa_llegada / capacidad
+        if r >= 1:
+            return 1.0, math.inf, 0.0
+        cola_masa = pi_c * r / (1 - r)
+        cola_media = pi_c * r / (1 - r) ** 2
+    else:
+        cola = _pesos_cola(pi_c, tasa_llegada, capacidad, tasa_abandono)
+        cola_masa = cola.sum()
+        cola_media = (np.arange(1, len(cola) + 1) * cola).sum()
+    
+    total = base.sum() + cola_masa
+    prob_espera = (pi_c + cola_masa) / total
+    cola_promedio = cola_media / total
+    return float(prob_espera), float(cola_promedio), float(tasa_abandono * cola_promedio / tasa_llegada)
+
+
+def espera_atendidos(
+    tasa_llegada: float,
+    tasa_servicio: float,
+    servidores: int,
+    tasa_abandono: float
+) -> float:
+    """Espera promedio en cola de los clientes que sí son atendidos en M/M/c+M
+    
+    Es lo que mide la simulación. No vale L_q/λ_atendidos: la cola también
+    guarda el tiempo de quienes luego abandonan. Un cliente que llega y
+    encuentra j en cola pasa por las etapas m = j, ..., 0 (m clientes delante),
+    cada una exponencial de tasa c·μ + (m+1)·θ, y sigue en la cola al final
+    de cada una con probabilidad (c·μ + m·θ) / (c·μ + (m+1)·θ).
+    """
+    if tasa_llegada <= 0:
+        return 0.0
+    if servidores <= 0:
+        return math.inf
+    if tasa_abandono <= 0:
+        # Nadie abandona: Little sobre todos los clientes
+        _, cola_promedio, _ = erlang_a(tasa_llegada, tasa_servicio, servidores, tasa_abandono)
+        return cola_promedio / tasa_llegada
+    
+    base = _pesos_sin_cola(tasa_llegada / tasa_servicio, servidores)
+    capacidad = servidores * tasa_servicio
+    # Por PASTA, pesos de encontrar j = 0, 1, ... clientes en cola al llegar
+    encuentra = np.concatenate(([base[-1]], _pesos_cola(base[-1], tasa_llegada, capacidad, tasa_abandono)))
+    
+    m = np.arange(len(encuentra))
+    tasa_etapa = capacidad + (m + 1) * tasa_abandono
+    prob_atendido = np.cumprod((capacidad + m * tasa_abandono) / tasa_etapa)
+    espera_si_atendido = np.cumsum(1.0 / tasa_etapa)
+    
+    atendidos = base[:-1].sum() + (encuentra * prob_atendido).sum()
+    return float((encuentra * prob_atendido * espera_si_atendido).sum() / atendidos)
+
+
+def _reparto_cola_mas_corta(cajas: Dict[TipoCaja, int], tipos) -> Dict[TipoCaja, float]:
+    """Cola más corta entre tipos: reparto proporcional al número de cajas"""
+    presentes = {tipo: cajas[tipo] for tipo in tipos if cajas[tipo] > 0}
+    total = sum(presentes.values())
+    return {tipo: n / total for tipo, n in presentes.items()}
+
+
+def reparto_por_productos(
+    config_cajas: ConfiguracionCajas,
+    config_sim: ConfiguracionSimulacion,
+    politica: str = "balanceada"
+) -> Dict[int, Dict[TipoCaja, float]]:
+    """Fracción de clientes con k productos que cada política envía a cada tipo
+    
+    Las condiciones sobre la longitud de cola de las políticas (≤ 3 en
+    rápidas, ≤ 5 en humanas) se suponen siempre cumplidas.
+    """
+    cajas = {
+        TipoCaja.HUMANA: config_cajas.cajas_humanas,
+        TipoCaja.AUTOMATICA: config_cajas.cajas_automaticas,
+        TipoCaja.RAPIDA: config_cajas.cajas_rapidas,
+    }
+    
+    reparto = {}
+    for k in range(config_sim.productos_cliente_min, config_sim.productos_cliente_max + 1):
+        validos = [TipoCaja.HUMANA, TipoCaja.AUTOMATICA]
+        if k <= config_sim.max_productos_caja_rapida:
+            validos.append(TipoCaja.RAPIDA)
+        corta = _reparto_cola_mas_corta(cajas, validos)
+        
+        rapida = k <= UMBRAL_PRIORIDAD_RAPIDA and cajas[TipoCaja.RAPIDA] > 0
+        humana = cajas[TipoCaja.HUMANA] > 0
+        if politica == "prioridad_rapida" or (politica == "balanceada" and k <= UMBRAL_PRIORIDAD_RAPIDA):
+            reparto[k] = {TipoCaja.RAPIDA: 1.0} if rapida else corta
+        elif politica == "preferir_humana" and k > UMBRAL_PREFERIR_HUMANA:
+            reparto[k] = {TipoCaja.HUMANA: 1.0} if humana else corta
+        elif politica == "balanceada" and k > UMBRAL_BALANCEADA_HUMANA:
+            reparto[k] = {TipoCaja.HUMANA: 1.0} if humana else corta
+        else:
+            reparto[k] = corta
+    return reparto
+
+
+def aproximar(
+    config_cajas: ConfiguracionCajas,
+    config_sim: Optional[ConfiguracionSimulacion] = None,
+    politica: str = "balanceada",
+    alta_demanda: bool = False
+) -> AproximacionAnalitica:
+    """Erlang-A por tipo de caja con el reparto de clientes de la política
+    
+    Cada tipo se trata como un grupo de cajas con cola común, servicio
+    exponencial con la media real (base más productos) y paciencia
+    exponencial con la media de la tolerancia. El sesgo frente a la
+    simulación no tiene un signo fijo en ninguna métrica: la cola común
+    reparte mejor que una cola por caja, pero la paciencia exponencial
+    abandona antes que la uniforme de la simulación y el reparto supone que
+    las condiciones de longitud de cola de las políticas siempre se cumplen.
+    """
+    config_sim = config_sim or ConfiguracionSimulacion()
+    tasa = config_sim.tasa_llegada_alta if alta_demanda else config_sim.tasa_llegada_normal
+    base = {
+        TipoCaja.HUMANA: config_sim.tiempo_servicio_humana,
+        TipoCaja.AUTOMATICA: config_sim.tiempo_servicio_automatica * FACTOR_INEXPERIENCIA_MEDIO,
+        TipoCaja.RAPIDA: config_sim.tiempo_servicio_rapida,
+    }
+    cajas = {
+        TipoCaja.HUMANA: config_cajas.cajas_humanas,
+        TipoCaja.AUTOMATICA: config_cajas.cajas_automaticas,
+        TipoCaja.RAPIDA: config_cajas.cajas_rapidas,
+    }
+    paciencia = (config_sim.tiempo_abandono_min + config_sim.tiempo_abandono_max) / 2
+    tasa_abandono = 1.0 / paciencia if paciencia > 0 else 0.0
+    
+    reparto = reparto_por_productos(config_cajas, config_sim, politica)
+    prob_k = 1.0 / len(reparto)
+    llegadas = {tipo: 0.0 for tipo in cajas}
+    productos = {tipo: 0.0 for tipo in cajas}
+    sin_caja = 0.0
+    for k, fracciones in reparto.items():
+        if not fracciones:
+            sin_caja += prob_k
+        for tipo, fraccion in fracciones.items():
+            llegadas[tipo] += tasa * prob_k * fraccion
+            productos[tipo] += tasa * prob_k * fraccion * k
+    
+    por_tipo = {}
+    abandonos = tasa * sin_caja
+    atendidos = 0.0
+    espera_total = 0.0
+    trabajo = 0.0
+    for tipo, llegada in llegadas.items():
+        if llegada <= 0:
+            continue
+        servicio = base[tipo] + productos[tipo] / llegada * config_sim.tiempo_por_producto
+        prob_espera, _, prob_abandono = erlang_a(llegada, 1.0 / servicio, cajas[tipo], tasa_abandono)
+        espera = espera_atendidos(llegada, 1.0 / servicio, cajas[tipo], tasa_abandono)
+        por_tipo[tipo] = AproximacionTipo(
+            cajas=cajas[tipo],
+            tasa_llegada=llegada,
+            tiempo_servicio=servicio,
+            utilizacion=min(llegada * (1 - prob_abandono) * servicio / cajas[tipo], 1.0),
+            prob_espera=prob_espera,
+            espera_promedio=espera,
+            prob_abandono=prob_abandono
+        )
+        abandonos += llegada * prob_abandono
+        if prob_abandono < 1:
+            atendidos += llegada * (1 - prob_abandono)
+            espera_total += llegada * (1 - prob_abandono) * espera
+        trabajo += llegada * servicio
+    
+    return AproximacionAnalitica(
+        por_tipo=por_tipo,
+        tasa_abandono=100.0 * abandonos / tasa,
+        tiempo_espera_promedio=espera_total / atendidos if atendidos > 0 else 0.0,
+        carga_ofrecida=trabajo / max(config_cajas.total_cajas(), 1),
+        sin_caja=sin_caja
+    )
+
+
+def claramente_infactible(
+    aproximacion: AproximacionAnalitica,
+    max_espera_promedio: float,
+    margen: float = 1.5
+) -> bool:
+    """La espera promedio aproximada ya excede el límite por más del margen
+    
+    La aproximación no acota a la simulación en ningún sentido (con
+    sobrecarga puede sobrestimar la espera), así que `margen` es un factor
+    de seguridad empírico, no una garantía de no descartar un factible.
+    """
+    return aproximacion.tiempo_espera_promedio > max_espera_promedio * margen
@@ -0,0 +1,132 @@
+"""
+Caché en disco de resúmenes de réplicas, direccionada por contenido y con desalojo LRU
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hashlib
+import json
+import pickle
+import tempfile
+from dataclasses import asdict
+from typing import Optional
+
+from config import BASE_DIR
+from simulacion.supermercado import VERSION_MOTOR
+from analisis.replicas import ResumenReplica, TareaReplica
+
+
+DIRECTORIO_CACHE = os.path.join(BASE_DIR, ".cache", "replicas")
+TAMANO_MAXIMO_CACHE = 256 * 1024 * 1024  # 256 MB
+
+
+def clave_tarea(tarea: TareaReplica) -> str:
+    """SHA-256 de todo lo que determina el resultado de una réplica
+    
+    Incluye las configuraciones, la política, la demanda, la semilla, el
+    motor, el muestreo, el modo de estadísticas, la corrida antitética y
+    VERSION_MOTOR; `incluir_stats` no cambia el resumen y queda fuera.
+    """
+    contenido = {
+        'config_sim': asdict(tarea.config_sim),
+        'config_cajas': asdict(tarea.config_cajas),
+        'costos': asdict(tarea.costos),
+        'politica': tarea.politica,
+        'alta_demanda': tarea.alta_demanda,
+        'semilla': tarea.semilla,
+        'motor': tarea.motor,
+        'muestreo': tarea.muestreo,
+        'modo_estadisticas': tarea.modo_estadisticas,
+        'antitetico': tarea.antitetico,
+        'version': VERSION_MOTOR,
+    }
+    texto = json.dumps(contenido, sort_keys=True, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+class CacheResultados:
+    """Un archivo pickle por réplica, nombrado por la clave de su tarea
+    
+    La fecha de modificación hace de marca de último uso: cada acierto la
+    renueva y, cuando el directorio supera `tamano_maximo` bytes, se borran
+    las entradas usadas hace más tiempo.
+    """
+    
+    def __init__(
+        self,
+        directorio: str = DIRECTORIO_CACHE,
+        tamano_maximo: int = TAMANO_MAXIMO_CACHE
+    ):
+        self.directorio = directorio
+        self.tamano_maximo = tamano_maximo
+        self.aciertos = 0
+        self.fallos = 0
+        os.makedirs(directorio, exist_ok=True)
+        self._tamano = sum(
+            entrada.stat().st_size for entrada in os.scandir(directorio)
+            if entrada.name.endswith('.pkl')
+        )
+    
+    def _ruta(self, clave: str) -> str:
+        """Archivo de una entrada"""
+        return os.path.join(self.directorio, f"{clave}.pkl")
+    
+    def obtener(self, tarea: TareaReplica) -> Optional[ResumenReplica]:
+        """Resumen guardado de la tarea (None si no está o no se puede leer)"""
+        ruta = self._ruta(clave_tarea(tarea))
+        try:
+            with open(ruta, 'rb') as archivo:
+                resumen = pickle.load(archivo)
+            os.utime(ruta)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        return resumen
+    
+    def guardar(self, tarea: TareaReplica, resumen: ResumenReplica):
+        """Escribe el resumen de forma atómica y desaloja si se excede el tamaño"""
+        ruta = self._ruta(clave_tarea(tarea))
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as archivo:
+                pickle.dump(resumen, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+            anterior = os.path.getsize(ruta) if os.path.exists(ruta) else 0
+            os.replace(temporal, ruta)
+        except BaseException:
+            # No dejar temporales huérfanos (disco lleno, pickle fallido, Ctrl+C)
+            try:
+                os.unlink(temporal)
+            except OSError:
+                pass
+            raise
+        self._tamano += os.path.getsize(ruta) - anterior
+        
+        if self._tamano > self.tamano_maximo:
+            self._desalojar()
+    
+    def _desalojar(self):
+        """Borra las entradas menos usadas hasta quedar en el 90% del máximo"""
+        entradas = sorted(
+            (e for e in os.scandir(self.directorio) if e.name.endswith('.pkl')),
+            key=lambda e: e.stat().st_mtime
+        )
+        self._tamano = sum(e.stat().st_size for e in entradas)
+        objetivo = 0.9 * self.tamano_maximo
+        for entrada in entradas:
+            if self._tamano <= objetivo:
+                break
+            tamano = entrada.stat().st_size
+            try:
+                os.remove(entrada.path)
+            except OSError:
+                continue
+            self._tamano -= tamano
+    
+    def limpiar(self):
+        """Borra todas las entradas"""
+        for entrada in os.scandir(self.directorio):
+            if entrada.name.endswith('.pkl'):
+                os.remove(entrada.path)
+        self._tamano = 0
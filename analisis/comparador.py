@@ -5,7 +5,9 @@ import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import Dict, List, Tuple
+import math
+from itertools import product
+from typing import Callable, Dict, List, Optional, Tuple
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
@@ -14,17 +16,55 @@ from config import (
     ConfiguracionSimulacion, ConfiguracionCajas, 
     CostosOperacionales, ESCENARIOS
 )
-from simulacion.supermercado import Supermercado
-from simulacion.estadisticas import EstadisticasSimulacion
+from simulacion.estadisticas import EstadisticasSimulacion, PERCENTILES_ESPERA
+from simulacion.acumuladores import BocetoCuantiles
+from analisis.cache import CacheResultados
+from analisis.repositorio import RepositorioCorridas
+from analisis.replicas import (
+    ResumenReplica, TareaReplica, costo_estimado, ejecutar_replicas,
+    ejecutar_replicas_en_flujo, generar_semillas, intervalo_confianza,
+    observaciones_independientes, estimar_con_control, CONTROLES_POR_DEFECTO
+)
+
+
+POLITICAS = ["cola_mas_corta", "prioridad_rapida", "preferir_humana", "balanceada"]
+
+
+def _validar_semiancho(semiancho_objetivo: Optional[float]):
+    """El semiancho objetivo del replicado adaptativo debe ser positivo"""
+    if semiancho_objetivo is not None and not semiancho_objetivo > 0:
+        raise ValueError(f"semiancho_objetivo debe ser positivo (recibido: {semiancho_objetivo})")
 
 
 class ComparadorEscenarios:
     """Ejecuta y compara múltiples escenarios de simulación"""
     
-    def __init__(self, duracion_simulacion: float = 480.0):
+    def __init__(
+        self,
+        duracion_simulacion: float = 480.0,
+        motor: str = "simpy",
+        muestreo: str = "escalar",
+        modo_estadisticas: str = "completas",
+        semilla: Optional[int] = None,
+        cache: Optional[CacheResultados] = None,
+        repositorio: Optional[RepositorioCorridas] = None
+    ):
         self.duracion = duracion_simulacion
+        self.motor = motor  # "heap" para corridas por lotes más rápidas
+        self.muestreo = muestreo  # "bloques" para sortear con NumPy por bloques
+        self.modo_estadisticas = modo_estadisticas  # "streaming" para horizontes largos
         self.resultados: Dict[str, Dict] = {}
         self.costos = CostosOperacionales()
+        
+        # Semilla base común: la réplica i de cada escenario usa la misma semilla
+        # (números aleatorios comunes), lo que permite comparaciones pareadas
+        self.semilla = semilla if semilla is not None else generar_semillas(1)[0]
+        
+        # Caché en disco de réplicas (útil solo con semilla fija)
+        self.cache = cache
+        
+        # Repositorio SQLite donde se persiste cada resultado consolidado
+        self.repositorio = repositorio
     
     def ejecutar_escenario(
         self,
@@ -32,62 +72,203 @@ class ComparadorEscenarios:
         config_cajas: ConfiguracionCajas,
         politica: str = "balanceada",
         alta_demanda: bool = False,
-        repeticiones: int = 1
+        repeticiones: int = 1,
+        workers: Optional[int] = None,
+        semilla: Optional[int] = None,
+        semiancho_objetivo: Optional[float] = None,
+        max_repeticiones: int = 30,
+        confianza: float = 0.95,
+        antiteticas: bool = False,
+        variables_control: bool = False
     ) -> Dict:
-        """Ejecuta un escenario (opcionalmente múltiples veces para promedio)"""
-        
-        resultados_rep = []
+        """Ejecuta un escenario (opcionalmente múltiples veces para promedio)
         
-        for i in range(repeticiones):
-            config_sim = ConfiguracionSimulacion(duracion_simulacion=self.duracion)
-            
-            supermercado = Supermercado(
-                config_sim=config_sim,
-                config_cajas=config_cajas,
-                politica=politica,
-                alta_demanda=alta_demanda
-            )
-            
-            stats = supermercado.ejecutar()
-            
-            duracion_horas = self.duracion / 60.0
-            costo_beneficio = stats.calcular_costo_beneficio(
-                config_cajas, duracion_horas, self.costos
+        Con workers > 1 las réplicas se reparten en un pool de procesos; cada
+        una recibe su propia semilla derivada de `semilla`, así que el
+        resultado es idéntico al de una ejecución en serie con la misma semilla.
+        Con `semiancho_objetivo` replica por lotes hasta alcanzar esa precisión
+        y con `antiteticas` corre pares antitéticos (ver ejecutar_barrido).
+        """
+        _validar_semiancho(semiancho_objetivo)
+        if semiancho_objetivo is not None or antiteticas:
+            self.ejecutar_barrido(
+                escenarios={nombre: config_cajas},
+                politicas=[politica],
+                demandas=[alta_demanda],
+                repeticiones=repeticiones,
+                workers=workers,
+                semilla=semilla,
+                formato_nombre="{escenario}",
+                semiancho_objetivo=semiancho_objetivo,
+                max_repeticiones=max_repeticiones,
+                confianza=confianza,
+                antiteticas=antiteticas,
+                variables_control=variables_control
             )
-            
-            resultados_rep.append({
-                'stats': stats,
-                'costo_beneficio': costo_beneficio
-            })
+            return self.resultados[nombre]
+        
+        semilla = self._semilla_base(semilla)
+        semillas = generar_semillas(repeticiones, semilla)
+        tareas = [
+            self._crear_tarea(config_cajas, politica, alta_demanda, semilla_rep,
+                              incluir_stats=(i == repeticiones - 1))
+            for i, semilla_rep in enumerate(semillas)
+        ]
+        
+        salidas = ejecutar_replicas(tareas, workers, self.cache)
+        replicas = [resumen for resumen, _ in salidas]
+        stats = salidas[-1][1]
         
+        return self._registrar_resultado(
+            nombre, config_cajas, politica, alta_demanda, replicas, stats,
+            escenario=nombre, semilla_base=semilla
+        )
+    
+    def _semilla_base(self, semilla: Optional[int]) -> int:
+        """Semilla explícita o, si no se indica, la común del comparador"""
+        return self.semilla if semilla is None else semilla
+    
+    def _crear_tarea(
+        self,
+        config_cajas: ConfiguracionCajas,
+        politica: str,
+        alta_demanda: bool,
+        semilla: int,
+        incluir_stats: bool = False,
+        antitetico: bool = False
+    ) -> TareaReplica:
+        """Construye la tarea de una réplica con la configuración del comparador"""
+        return TareaReplica(
+            config_sim=ConfiguracionSimulacion(duracion_simulacion=self.duracion),
+            config_cajas=config_cajas,
+            politica=politica,
+            alta_demanda=alta_demanda,
+            semilla=semilla,
+            costos=self.costos,
+            incluir_stats=incluir_stats,
+            motor=self.motor,
+            muestreo=self.muestreo,
+            modo_estadisticas=self.modo_estadisticas,
+            antitetico=antitetico
+        )
+    
+    def _registrar_resultado(
+        self,
+        nombre: str,
+        config_cajas: ConfiguracionCajas,
+        politica: str,
+        alta_demanda: bool,
+        replicas: List[ResumenReplica],
+        stats: EstadisticasSimulacion,
+        confianza: float = 0.95,
+        escenario: Optional[str] = None,
+        indice_stats: Optional[int] = None,
+        semilla_base: Optional[int] = None
+    ) -> Dict:
+        """Consolida las réplicas de un escenario y lo guarda en resultados (y en el repositorio)"""
         # Promediar si hay múltiples repeticiones
-        if repeticiones > 1:
-            resultado_final = self._promediar_resultados(resultados_rep)
+        if len(replicas) > 1:
+            resultado_final = self._promediar_resultados(replicas, stats)
         else:
-            resultado_final = resultados_rep[0]
+            resultado_final = {
+                'stats': stats,
+                'costo_beneficio': replicas[0].costo_beneficio
+            }
         
         resultado_final['nombre'] = nombre
         resultado_final['config_cajas'] = config_cajas
         resultado_final['politica'] = politica
         resultado_final['alta_demanda'] = alta_demanda
+        resultado_final['replicas'] = replicas
+        resultado_final['boceto_espera'] = self._combinar_bocetos(replicas)
+        resultado_final['intervalo_espera'] = intervalo_confianza(
+            observaciones_independientes(replicas), confianza
+        )
+        resultado_final['control_espera'] = self._estimar_control_o_nada(replicas, confianza)
+        resultado_final['confianza'] = confianza
+        resultado_final['escenario'] = escenario
+        resultado_final['indice_stats'] = len(replicas) - 1 if indice_stats is None else indice_stats
+        resultado_final['semilla_base'] = semilla_base
         
         self.resultados[nombre] = resultado_final
+        if self.repositorio is not None:
+            self.repositorio.guardar_resultado(
+                resultado_final, self.duracion, motor=self.motor, muestreo=self.muestreo,
+                origen="comparador"
+            )
         return resultado_final
     
-    def _promediar_resultados(self, resultados: List[Dict]) -> Dict:
-        """Promedia resultados de múltiples ejecuciones"""
-        # Tomar el último stats (para el DataFrame)
-        stats = resultados[-1]['stats']
+    @staticmethod
+    def _combinar_bocetos(replicas: List[ResumenReplica]) -> BocetoCuantiles:
+        """Une los histogramas de espera de todas las réplicas"""
+        boceto = BocetoCuantiles()
+        for replica in replicas:
+            boceto.combinar(replica.boceto_espera)
+        return boceto
+    
+    @staticmethod
+    def _estimar_control_o_nada(
+        replicas: List[ResumenReplica],
+        confianza: float
+    ) -> Optional[Dict]:
+        """Estimación con variables de control de la espera (None si faltan réplicas)"""
+        try:
+            return estimar_con_control(replicas, confianza=confianza)
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _media_replicas(replicas: List[ResumenReplica], campo: str) -> float:
+        """Promedio de un KPI sobre las réplicas"""
+        return float(np.mean([getattr(replica, campo) for replica in replicas]))
+    
+    def _siguiente_lote(
+        self,
+        replicas: List[ResumenReplica],
+        semiancho_objetivo: float,
+        max_repeticiones: int,
+        confianza: float,
+        tam_grupo: int = 1,
+        variables_control: bool = False
+    ) -> range:
+        """Índices de las réplicas a agregar (vacío si ya se alcanzó la precisión)
+        
+        `tam_grupo` es el número de corridas por observación independiente
+        (2 con pares antitéticos). Con `variables_control` se usa el semiancho
+        del estimador ajustado cuando es menor (con pocas réplicas no lo es).
+        """
+        n = len(replicas)
+        if n >= max_repeticiones:
+            return range(0)
+        observaciones = observaciones_independientes(replicas)
+        _, semiancho = intervalo_confianza(observaciones, confianza)
+        if variables_control:
+            control = self._estimar_control_o_nada(replicas, confianza)
+            if control is not None:
+                semiancho = min(semiancho, control['semiancho'])
+        if semiancho <= semiancho_objetivo:
+            return range(0)
         
+        # El semiancho decrece como 1/√n; a lo sumo se duplica n por ronda
+        # para no sobreestimar con la varianza ruidosa de pocas réplicas
+        necesarias = math.ceil(len(observaciones) * (semiancho / semiancho_objetivo) ** 2)
+        return range(n, min(necesarias * tam_grupo, 2 * n, max_repeticiones))
+    
+    def _promediar_resultados(
+        self,
+        replicas: List[ResumenReplica],
+        stats: EstadisticasSimulacion
+    ) -> Dict:
+        """Promedia resultados de múltiples ejecuciones"""
         # Promediar métricas numéricas
-        clientes_atendidos = np.mean([r['stats'].clientes_atendidos for r in resultados])
-        clientes_abandonaron = np.mean([r['stats'].clientes_abandonaron for r in resultados])
-        tiempo_espera = np.mean([r['stats'].tiempo_espera_promedio for r in resultados])
+        clientes_atendidos = np.mean([r.clientes_atendidos for r in replicas])
+        clientes_abandonaron = np.mean([r.clientes_abandonaron for r in replicas])
+        tiempo_espera = np.mean([r.tiempo_espera_promedio for r in replicas])
         
         # Promediar costo-beneficio
         costo_beneficio = {}
-        for key in resultados[0]['costo_beneficio'].keys():
-            costo_beneficio[key] = np.mean([r['costo_beneficio'][key] for r in resultados])
+        for key in replicas[0].costo_beneficio.keys():
+            costo_beneficio[key] = np.mean([r.costo_beneficio[key] for r in replicas])
         
         return {
             'stats': stats,
@@ -99,48 +280,189 @@ class ComparadorEscenarios:
             }
         }
     
+    def ejecutar_barrido(
+        self,
+        escenarios: Optional[Dict[str, ConfiguracionCajas]] = None,
+        politicas: Optional[List[str]] = None,
+        demandas: Optional[List[bool]] = None,
+        repeticiones: int = 1,
+        workers: Optional[int] = None,
+        semilla: Optional[int] = None,
+        formato_nombre: str = "{escenario}_{politica}_{demanda}",
+        al_completar: Optional[Callable[[str, Dict], None]] = None,
+        semiancho_objetivo: Optional[float] = None,
+        max_repeticiones: int = 30,
+        confianza: float = 0.95,
+        antiteticas: bool = False,
+        variables_control: bool = False
+    ) -> Dict[str, Dict]:
+        """Ejecuta escenarios × políticas × demandas × réplicas como un solo trabajo
+        
+        Todas las réplicas van a un único pool de procesos, las de alta demanda
+        (más largas) primero. Cada combinación se consolida en `self.resultados`
+        en cuanto terminan todas sus réplicas.
+        
+        Con `semiancho_objetivo` (minutos) el número de réplicas es adaptativo:
+        se ejecutan por rondas, empezando con `repeticiones` (mínimo 2), y cada
+        combinación sigue replicando hasta que el semiancho del intervalo de
+        confianza de su espera promedio baja del objetivo o llega a
+        `max_repeticiones`. Las réplicas i usan siempre la misma semilla.
+        
+        Con `antiteticas` las réplicas van en pares que comparten semilla; la
+        segunda corrida de cada par refleja sus uniformes (u → 1−u) y la
+        varianza se estima sobre las medias de los pares. Con
+        `variables_control` el criterio de parada usa el estimador ajustado por
+        variables de control (ver estimar_con_control).
+        """
+        _validar_semiancho(semiancho_objetivo)
+        escenarios = escenarios if escenarios is not None else ESCENARIOS
+        politicas = politicas or ["balanceada"]
+        demandas = demandas if demandas is not None else [False, True]
+        
+        adaptativo = semiancho_objetivo is not None
+        tam_grupo = 2 if antiteticas else 1
+        if adaptativo:
+            # Al menos dos observaciones independientes para estimar la varianza
+            max_repeticiones = max(max_repeticiones // tam_grupo, 2) * tam_grupo
+            repeticiones = min(max(repeticiones, 2 * tam_grupo), max_repeticiones)
+        repeticiones = math.ceil(repeticiones / tam_grupo) * tam_grupo
+        total = max_repeticiones if adaptativo else repeticiones
+        semilla = self._semilla_base(semilla)
+        semillas = generar_semillas(total // tam_grupo, semilla)
+        
+        combinaciones = {}
+        for (escenario, config), politica, alta in product(escenarios.items(), politicas, demandas):
+            nombre = formato_nombre.format(
+                escenario=escenario,
+                politica=politica,
+                demanda='alta' if alta else 'normal'
+            )
+            combinaciones[nombre] = {
+                'escenario': escenario,
+                'config_cajas': config,
+                'politica': politica,
+                'alta_demanda': alta,
+                'replicas': {},
+                'stats': None,
+                'lote': range(repeticiones)
+            }
+        
+        activas = dict(combinaciones)
+        while activas:
+            tareas = []
+            for nombre, combinacion in activas.items():
+                for i in combinacion['lote']:
+                    tarea = self._crear_tarea(
+                        combinacion['config_cajas'], combinacion['politica'],
+                        combinacion['alta_demanda'], semillas[i // tam_grupo],
+                        incluir_stats=(i == repeticiones - 1),
+                        antitetico=(i % tam_grupo == 1)
+                    )
+                    tareas.append(((nombre, i), tarea))
+            pendientes = {nombre: len(c['lote']) for nombre, c in activas.items()}
+            
+            # Las corridas más costosas primero para equilibrar la carga al final
+            tareas.sort(key=lambda t: costo_estimado(t[1]), reverse=True)
+            
+            for (nombre, i), (resumen, stats) in ejecutar_replicas_en_flujo(tareas, workers, self.cache):
+                combinacion = combinaciones[nombre]
+                combinacion['replicas'][i] = resumen
+                if stats is not None:
+                    combinacion['stats'] = stats
+                pendientes[nombre] -= 1
+                if pendientes[nombre] > 0:
+                    continue
+                
+                replicas = [combinacion['replicas'][j] for j in sorted(combinacion['replicas'])]
+                if adaptativo:
+                    combinacion['lote'] = self._siguiente_lote(
+                        replicas, semiancho_objetivo, max_repeticiones, confianza,
+                        tam_grupo, variables_control
+                    )
+                else:
+                    combinacion['lote'] = range(0)
+                
+                if not combinacion['lote']:
+                    resultado = self._registrar_resultado(
+                        nombre,
+                        combinacion['config_cajas'],
+                        combinacion['politica'],
+                        combinacion['alta_demanda'],
+                        replicas,
+                        combinacion['stats'],
+                        confianza,
+                        escenario=combinacion['escenario'],
+                        indice_stats=repeticiones - 1,
+                        semilla_base=semilla
+                    )
+                    if al_completar:
+                        al_completar(nombre, resultado)
+            
+            activas = {nombre: c for nombre, c in activas.items() if c['lote']}
+        
+        # Dejar las combinaciones en orden de barrido (no de llegada)
+        for nombre in combinaciones:
+            self.resultados[nombre] = self.resultados.pop(nombre)
+        
+        return {nombre: self.resultados[nombre] for nombre in combinaciones}
+    
     def ejecutar_todos_escenarios(
         self,
         alta_demanda: bool = False,
-        politica: str = "balanceada"
+        politica: str = "balanceada",
+        repeticiones: int = 1,
+        workers: Optional[int] = None,
+        semilla: Optional[int] = None
     ):
         """Ejecuta todos los escenarios predefinidos"""
-        for nombre, config in ESCENARIOS.items():
-            print(f"Ejecutando escenario: {nombre}...")
-            self.ejecutar_escenario(
-                nombre=nombre,
-                config_cajas=config,
-                politica=politica,
-                alta_demanda=alta_demanda
-            )
+        self.ejecutar_barrido(
+            politicas=[politica],
+            demandas=[alta_demanda],
+            repeticiones=repeticiones,
+            workers=workers,
+            semilla=semilla,
+            formato_nombre="{escenario}",
+            al_completar=lambda nombre, _: print(f"Escenario completado: {nombre}")
+        )
         print("✅ Todos los escenarios completados")
     
     def comparar_politicas(
         self,
         config_cajas: ConfiguracionCajas,
-        alta_demanda: bool = False
+        alta_demanda: bool = False,
+        repeticiones: int = 1,
+        workers: Optional[int] = None,
+        semilla: Optional[int] = None
     ):
         """Compara diferentes políticas de asignación"""
-        politicas = ["cola_mas_corta", "prioridad_rapida", "preferir_humana", "balanceada"]
-        
-        for politica in politicas:
-            nombre = f"politica_{politica}"
-            print(f"Probando política: {politica}...")
-            self.ejecutar_escenario(
-                nombre=nombre,
-                config_cajas=config_cajas,
-                politica=politica,
-                alta_demanda=alta_demanda
-            )
+        self.ejecutar_barrido(
+            escenarios={"": config_cajas},
+            politicas=POLITICAS,
+            demandas=[alta_demanda],
+            repeticiones=repeticiones,
+            workers=workers,
+            semilla=semilla,
+            formato_nombre="politica_{politica}",
+            al_completar=lambda nombre, _: print(f"Política completada: {nombre}")
+        )
     
     def obtener_tabla_comparativa(self) -> pd.DataFrame:
         """Genera tabla comparativa de resultados"""
         datos = []
         
         for nombre, resultado in self.resultados.items():
-            stats = resultado['stats']
+            replicas = resultado['replicas']
             cb = resultado['costo_beneficio']
             config = resultado['config_cajas']
+            boceto = resultado['boceto_espera']
+            espera_media, semiancho = resultado['intervalo_espera']
+            control = resultado['control_espera'] or {}
+            
+            # Percentiles sobre las esperas de todas las réplicas
+            percentiles = {
+                f'Espera p{p} (min)': round(boceto.cuantil(p / 100) or 0.0, 2)
+                for p in PERCENTILES_ESPERA
+            }
             
             datos.append({
                 'Escenario': nombre,
@@ -149,11 +471,19 @@ class ComparadorEscenarios:
                 'Cajas Rápidas': config.cajas_rapidas,
                 'Política': resultado['politica'],
                 'Alta Demanda': '✓' if resultado['alta_demanda'] else '',
-                'Clientes Atendidos': stats.clientes_atendidos,
-                'Abandonos': stats.clientes_abandonaron,
-                'Tasa Abandono (%)': round(stats.tasa_abandono, 1),
-                'Espera Promedio (min)': round(stats.tiempo_espera_promedio, 2),
-                'Espera Máxima (min)': round(stats.tiempo_espera_maximo, 2),
+                # KPIs como media de las réplicas, igual que el intervalo de confianza
+                'Clientes Atendidos': round(self._media_replicas(replicas, 'clientes_atendidos'), 1),
+                'Abandonos': round(self._media_replicas(replicas, 'clientes_abandonaron'), 1),
+                'Tasa Abandono (%)': round(self._media_replicas(replicas, 'tasa_abandono'), 1),
+                'Réplicas': len(replicas),
+                'Espera Promedio (min)': round(espera_media, 2),
+                f"IC{resultado['confianza']:.0%} Espera ± (min)": (
+                    round(semiancho, 2) if math.isfinite(semiancho) else np.nan
+                ),
+                'Espera VC (min)': round(control.get('media', np.nan), 2),
+                'IC VC ± (min)': round(control.get('semiancho', np.nan), 2),
+                'Espera Máxima (min)': round(self._media_replicas(replicas, 'tiempo_espera_maximo'), 2),
+                **percentiles,
                 'Throughput (cli/hora)': round(cb['throughput_hora'], 1),
                 'Costo/hora ($)': round(cb['costo_operacional_hora'], 2),
                 'Costo/cliente ($)': round(cb['costo_por_cliente'], 2),
@@ -162,6 +492,95 @@ class ComparadorEscenarios:
         
         return pd.DataFrame(datos)
     
+    def estimar_con_control(
+        self,
+        nombre: str,
+        metrica: str = "tiempo_espera_promedio",
+        controles: Tuple[str, ...] = CONTROLES_POR_DEFECTO,
+        confianza: float = 0.95
+    ) -> Dict:
+        """Media de una métrica ajustada con variables de control (ver replicas.estimar_con_control)"""
+        return estimar_con_control(
+            self.resultados[nombre]['replicas'], metrica, controles, confianza
+        )
+    
+    def comparar_pareado(
+        self,
+        nombre_a: str,
+        nombre_b: str,
+        metrica: str = "tiempo_espera_promedio",
+        confianza: float = 0.95
+    ) -> Dict:
+        """Diferencia media A − B de una métrica entre réplicas con la misma semilla
+        
+        Con números aleatorios comunes ambas réplicas de cada par ven los mismos
+        clientes, así que la varianza de la diferencia es mucho menor que la de
+        comparar dos muestras independientes. Las diferencias de las dos
+        corridas de un par antitético se promedian en una sola observación.
+        """
+        por_clave = {
+            (r.semilla, r.antitetico): r for r in self.resultados[nombre_b]['replicas']
+        }
+        por_semilla: Dict[int, List[float]] = {}
+        for replica in self.resultados[nombre_a]['replicas']:
+            otra = por_clave.get((replica.semilla, replica.antitetico))
+            if otra is not None:
+                por_semilla.setdefault(replica.semilla, []).append(
+                    getattr(replica, metrica) - getattr(otra, metrica)
+                )
+        diferencias = [float(np.mean(d)) for d in por_semilla.values()]
+        if not diferencias:
+            raise ValueError(f"{nombre_a} y {nombre_b} no comparten semillas de réplica")
+        
+        diferencia, semiancho = intervalo_confianza(diferencias, confianza)
+        return {
+            'a': nombre_a,
+            'b': nombre_b,
+            'metrica': metrica,
+            'diferencia': diferencia,
+            'semiancho': semiancho,
+            'replicas': len(diferencias),
+            'significativa': abs(diferencia) > semiancho
+        }
+    
+    def obtener_tabla_diferencias(
+        self,
+        referencia: Optional[str] = None,
+        nombres: Optional[List[str]] = None,
+        metrica: str = "tiempo_espera_promedio",
+        confianza: float = 0.95
+    ) -> pd.DataFrame:
+        """Diferencias pareadas de cada escenario contra una referencia
+        
+        Por defecto la referencia es el escenario con menor promedio de la métrica.
+        """
+        nombres = nombres if nombres is not None else list(self.resultados)
+        if not nombres:
+            return pd.DataFrame()
+        
+        if referencia is None:
+            referencia = min(nombres, key=lambda n: np.mean(
+                [getattr(r, metrica) for r in self.resultados[n]['replicas']]
+            ))
+        
+        datos = []
+        for nombre in nombres:
+            if nombre == referencia:
+                continue
+            par = self.comparar_pareado(nombre, referencia, metrica, confianza)
+            datos.append({
+                'Escenario': nombre,
+                'Referencia': referencia,
+                'Diferencia': round(par['diferencia'], 3),
+                f"IC{confianza:.0%} ±": (
+                    round(par['semiancho'], 3) if math.isfinite(par['semiancho']) else np.nan
+                ),
+                'Réplicas Pareadas': par['replicas'],
+                'Significativa': '✓' if par['significativa'] else ''
+            })
+        
+        return pd.DataFrame(datos)
+    
     def obtener_mejor_escenario(self, criterio: str = "tiempo_espera") -> Tuple[str, Dict]:
         """Encuentra el mejor escenario según un criterio"""
         if not self.resultados:
@@ -0,0 +1,179 @@
+"""
+Estimación en estado estable con una sola corrida larga (MSER-5 + medias por lotes)
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+from dataclasses import dataclass, replace
+from typing import Optional, Tuple
+import numpy as np
+
+from config import ConfiguracionSimulacion, ConfiguracionCajas, ESCENARIOS
+from simulacion.supermercado import Supermercado
+from simulacion.estadisticas import EstadisticasSimulacion
+from analisis.replicas import intervalo_confianza
+
+
+# Duración por defecto de la corrida larga (10 jornadas a tasa constante)
+DURACION_CORRIDA_LARGA = 4800.0
+
+
+@dataclass
+class EstimacionLotes:
+    """Media por lotes de una métrica con su intervalo de confianza"""
+    media: float
+    semiancho: float
+    num_lotes: int
+    tam_lote: int  # Observaciones por lote (minutos o clientes)
+    autocorrelacion: float  # Lag 1 entre lotes; cerca de 0 si los lotes son independientes
+
+
+@dataclass
+class ResultadoEstadoEstable:
+    """Estimaciones de estado estable de una corrida larga"""
+    duracion: float
+    corte_calentamiento: float  # Minutos descartados al inicio
+    corte_en_limite: bool  # MSER-5 eligió el máximo permitido: la corrida es corta
+    longitud_cola: EstimacionLotes
+    tiempo_espera: EstimacionLotes
+    clientes_descartados: int
+    confianza: float
+
+
+def mser5(serie: np.ndarray, tam_grupo: int = 5) -> Tuple[int, bool]:
+    """Punto de truncamiento MSER-5 (en observaciones) y si cayó en el límite
+    
+    Promedia la serie en grupos de 5 y elige el d que minimiza
+    Σ_{j>d} (Z_j − Z̄_d)² / (m − d)², buscando solo en la primera mitad.
+    """
+    m = len(serie) // tam_grupo
+    if m < 2:
+        return 0, False
+    grupos = np.asarray(serie[:m * tam_grupo], dtype=float).reshape(m, tam_grupo).mean(axis=1)
+    
+    # Sumas de los grupos que quedan tras descartar los d primeros
+    suma = np.cumsum(grupos[::-1])[::-1]
+    suma_cuadrados = np.cumsum((grupos * grupos)[::-1])[::-1]
+    restantes = np.arange(m, 0, -1, dtype=float)
+    dispersion = suma_cuadrados - suma * suma / restantes
+    mser = dispersion / (restantes * restantes)
+    
+    limite = m // 2
+    d = int(np.argmin(mser[:limite + 1]))
+    return d * tam_grupo, d == limite
+
+
+def medias_por_lotes(valores: np.ndarray, num_lotes: int = 20) -> np.ndarray:
+    """Media de cada uno de `num_lotes` lotes contiguos (el sobrante se descarta al inicio)"""
+    valores = np.asarray(valores, dtype=float)
+    tam_lote = len(valores) // num_lotes
+    if tam_lote == 0:
+        return np.empty(0)
+    sobrante = len(valores) - tam_lote * num_lotes
+    return valores[sobrante:].reshape(num_lotes, tam_lote).mean(axis=1)
+
+
+def estimar_por_lotes(
+    valores: np.ndarray,
+    num_lotes: int = 20,
+    confianza: float = 0.95
+) -> EstimacionLotes:
+    """Intervalo t sobre las medias por lotes (los lotes largos son casi independientes)"""
+    lotes = medias_por_lotes(valores, num_lotes)
+    media, semiancho = intervalo_confianza(lotes, confianza)
+    if lotes.size > 2 and np.std(lotes) > 0:
+        autocorrelacion = float(np.corrcoef(lotes[:-1], lotes[1:])[0, 1])
+    else:
+        autocorrelacion = math.nan
+    return EstimacionLotes(
+        media=media,
+        semiancho=semiancho,
+        num_lotes=int(lotes.size),
+        tam_lote=len(valores) // num_lotes,
+        autocorrelacion=autocorrelacion
+    )
+
+
+def analizar_estado_estable(
+    stats: EstadisticasSimulacion,
+    paso: float = 1.0,
+    num_lotes: int = 20,
+    confianza: float = 0.95
+) -> ResultadoEstadoEstable:
+    """Detecta el calentamiento en la cola y estima cola y espera con el resto
+    
+    La serie de cola son los promedios exactos por intervalo de `paso`
+    minutos. La espera usa los clientes atendidos que llegaron después del
+    corte, en orden de llegada.
+    """
+    if not len(stats.tabla):
+        raise ValueError("El análisis de estado estable necesita estadísticas completas")
+    
+    _, cola = stats.serie_cola.promedios_por_intervalo(paso, stats.tiempo_final)
+    indice_corte, en_limite = mser5(cola)
+    corte = indice_corte * paso
+    
+    llegadas = stats.tabla.columna('tiempo_llegada')
+    esperas = stats.tabla.columna('tiempo_espera')
+    atendidos = ~stats.tabla.columna('abandono')
+    posteriores = atendidos & (llegadas >= corte)
+    orden = np.argsort(llegadas[posteriores], kind='stable')
+    
+    return ResultadoEstadoEstable(
+        duracion=stats.tiempo_final,
+        corte_calentamiento=corte,
+        corte_en_limite=en_limite,
+        longitud_cola=estimar_por_lotes(cola[indice_corte:], num_lotes, confianza),
+        tiempo_espera=estimar_por_lotes(esperas[posteriores][orden], num_lotes, confianza),
+        clientes_descartados=int(np.count_nonzero(atendidos & (llegadas < corte))),
+        confianza=confianza
+    )
+
+
+def ejecutar_corrida_larga(
+    config_cajas: ConfiguracionCajas,
+    politica: str = "balanceada",
+    alta_demanda: bool = True,
+    duracion: float = DURACION_CORRIDA_LARGA,
+    semilla: Optional[int] = None,
+    config_sim: Optional[ConfiguracionSimulacion] = None,
+    motor: str = "heap",
+    muestreo: str = "bloques",
+    paso: float = 1.0,
+    num_lotes: int = 20,
+    confianza: float = 0.95
+) -> ResultadoEstadoEstable:
+    """Una corrida larga a tasa constante en lugar de muchas réplicas desde vacío"""
+    config_sim = replace(config_sim or ConfiguracionSimulacion(), duracion_simulacion=duracion)
+    supermercado = Supermercado(
+        config_sim=config_sim,
+        config_cajas=config_cajas,
+        politica=politica,
+        alta_demanda=alta_demanda,
+        semilla=semilla,
+        motor=motor,
+        muestreo=muestreo
+    )
+    stats = supermercado.ejecutar()
+    return analizar_estado_estable(stats, paso, num_lotes, confianza)
+
+
+def main():
+    """Estado estable de la hora pico en cada escenario"""
+    print("=" * 60)
+    print("ESTADO ESTABLE EN HORA PICO (MSER-5 + medias por lotes)")
+    print("=" * 60)
+    for nombre, config in ESCENARIOS.items():
+        r = ejecutar_corrida_larga(config, semilla=42)
+        aviso = " (corte en el límite: alargar la corrida)" if r.corte_en_limite else ""
+        print(f"\n{nombre}: calentamiento {r.corte_calentamiento:.0f} min{aviso}")
+        print(f"  Cola promedio: {r.longitud_cola.media:.2f} ± {r.longitud_cola.semiancho:.2f}"
+              f"  (ρ1 lotes = {r.longitud_cola.autocorrelacion:.2f})")
+        print(f"  Espera promedio: {r.tiempo_espera.media:.2f} ± {r.tiempo_espera.semiancho:.2f} min"
+              f"  (ρ1 lotes = {r.tiempo_espera.autocorrelacion:.2f})")
+
+
+if __name__ == "__main__":
+    main()
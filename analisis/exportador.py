@@ -0,0 +1,135 @@
+"""
+Exportación masiva a Parquet de registros por cliente y series de tiempo
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Dict, List
+import numpy as np
+
+from simulacion.estadisticas import EstadisticasSimulacion, DTYPE_REGISTRO, TIPOS_CAJA
+
+
+TAM_LOTE_PARQUET = 65_536  # Filas por lote (y por grupo de filas en el archivo)
+
+
+def _importar_pyarrow():
+    """Importa pyarrow solo cuando se exporta (dependencia opcional)"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError(
+            "La exportación a Parquet necesita pyarrow: pip install pyarrow"
+        ) from error
+    return pyarrow, pyarrow.parquet
+
+
+def _valor_particion(valor) -> str:
+    """Valor seguro para un directorio clave=valor"""
+    return str(valor).replace(os.sep, "_").replace("=", "_")
+
+
+class ExportadorParquet:
+    """Escribe cada réplica en su partición estilo Hive
+    
+    <directorio>/<tabla>/escenario=.../politica=.../demanda=.../replica=.../parte-0.parquet
+    
+    Las columnas se envuelven desde los arreglos NumPy de la simulación sin
+    convertirlas fila a fila, y se escriben por lotes de `tam_lote` filas.
+    Así pyarrow.dataset o DuckDB pueden leer todo el directorio como una
+    sola tabla y filtrar por las claves de partición.
+    """
+    
+    def __init__(
+        self,
+        directorio: str = "datos",
+        tam_lote: int = TAM_LOTE_PARQUET,
+        compresion: str = "zstd"
+    ):
+        self.directorio = directorio
+        self.tam_lote = tam_lote
+        self.compresion = compresion
+        self.archivos: List[str] = []  # Rutas escritas
+    
+    def _ruta(self, tabla: str, escenario: str, politica: str, alta_demanda: bool, replica: int) -> str:
+        """Archivo de una partición (crea sus directorios)"""
+        particion = os.path.join(
+            self.directorio,
+            tabla,
+            f"escenario={_valor_particion(escenario)}",
+            f"politica={_valor_particion(politica)}",
+            f"demanda={'alta' if alta_demanda else 'normal'}",
+            f"replica={int(replica)}"
+        )
+        os.makedirs(particion, exist_ok=True)
+        return os.path.join(particion, "parte-0.parquet")
+    
+    def _escribir(self, columnas: Dict[str, object], ruta: str) -> int:
+        """Escribe las columnas por lotes; devuelve el número de filas"""
+        pa, pq = _importar_pyarrow()
+        tabla = pa.table(columnas)
+        with pq.ParquetWriter(ruta, tabla.schema, compression=self.compresion) as escritor:
+            for lote in tabla.to_batches(max_chunksize=self.tam_lote):
+                escritor.write_batch(lote)
+        self.archivos.append(ruta)
+        return tabla.num_rows
+    
+    def exportar_clientes(
+        self,
+        stats: EstadisticasSimulacion,
+        escenario: str,
+        politica: str,
+        alta_demanda: bool,
+        replica: int = 0
+    ) -> int:
+        """Registros por cliente de una réplica (0 filas con estadísticas en streaming)"""
+        if not len(stats.tabla):
+            return 0
+        pa, _ = _importar_pyarrow()
+        columnas = {}
+        for nombre in DTYPE_REGISTRO.names:
+            valores = stats.tabla.columna(nombre)
+            if nombre == 'tipo_caja':
+                columnas[nombre] = pa.DictionaryArray.from_arrays(
+                    pa.array(valores, mask=valores < 0),
+                    pa.array([t.value for t in TIPOS_CAJA])
+                )
+            elif nombre in ('tiempo_inicio_servicio', 'tiempo_fin_servicio'):
+                # NaN marca "sin dato" en el registro; en Parquet es nulo
+                columnas[nombre] = pa.array(valores, mask=np.isnan(valores))
+            else:
+                columnas[nombre] = pa.array(valores)
+        ruta = self._ruta('clientes', escenario, politica, alta_demanda, replica)
+        return self._escribir(columnas, ruta)
+    
+    def exportar_series(
+        self,
+        stats: EstadisticasSimulacion,
+        escenario: str,
+        politica: str,
+        alta_demanda: bool,
+        replica: int = 0,
+        paso: float = 1.0
+    ) -> int:
+        """Cola, clientes en sistema y throughput cada `paso` minutos"""
+        ruta = self._ruta('series', escenario, politica, alta_demanda, replica)
+        return self._escribir(stats.series_columnares(paso), ruta)
+    
+    def exportar_resultados(self, resultados: Dict[str, Dict], paso: float = 1.0) -> int:
+        """Exporta la réplica con estadísticas completas de cada resultado de ComparadorEscenarios"""
+        filas = 0
+        for nombre, resultado in resultados.items():
+            stats = resultado.get('stats')
+            if stats is None:
+                continue
+            claves = (
+                resultado.get('escenario') or nombre,
+                resultado['politica'],
+                resultado['alta_demanda'],
+                resultado.get('indice_stats', len(resultado['replicas']) - 1)
+            )
+            filas += self.exportar_clientes(stats, *claves)
+            self.exportar_series(stats, *claves, paso=paso)
+        return filas
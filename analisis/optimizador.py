@@ -0,0 +1,329 @@
+"""
+Optimizador de la configuración de cajas por simulación (halving sucesivo)
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+
+from config import ConfiguracionSimulacion, ConfiguracionCajas, CostosOperacionales
+from analisis.analitico import aproximar, claramente_infactible
+from analisis.cache import CacheResultados
+from analisis.replicas import (
+    ResumenReplica, TareaReplica, costo_estimado, ejecutar_replicas_en_flujo,
+    generar_semillas, intervalo_confianza
+)
+
+
+# Estados de un candidato al terminar la búsqueda
+FACTIBLE = "factible"      # Cumple ambos SLA con la confianza pedida
+PROBABLE = "probable"      # Los cumple en promedio pero sin confianza suficiente
+INFACTIBLE = "infactible"  # Incumple algún SLA con la confianza pedida
+DOMINADO = "dominado"      # Hay candidatos factibles más baratos
+DESCARTADO = "descartado"  # Eliminado por el halving (penalización alta)
+PREFILTRADO = "prefiltrado"  # Descartado sin simular por la aproximación Erlang-A
+
+
+@dataclass
+class RestriccionesServicio:
+    """Niveles de servicio exigidos a una configuración"""
+    max_tasa_abandono: float = 10.0   # % de clientes
+    max_espera_promedio: float = 4.0  # minutos
+
+
+@dataclass
+class LimitesCajas:
+    """Espacio de búsqueda: cajas por tipo, total y presupuesto por hora"""
+    max_humanas: int = 10
+    max_automaticas: int = 8
+    max_rapidas: int = 3
+    max_total: int = 14
+    presupuesto_hora: Optional[float] = None  # USD/hora (None = sin límite)
+
+
+@dataclass
+class Candidato:
+    """Configuración evaluada y sus réplicas acumuladas"""
+    config: ConfiguracionCajas
+    costo_hora: float
+    replicas: List[ResumenReplica] = field(default_factory=list)
+    estado: Optional[str] = None
+    ronda: int = 0  # Última ronda en la que se simuló
+    
+    def intervalo(self, metrica: str, confianza: float) -> Tuple[float, float]:
+        """Media y semiancho de una métrica sobre las réplicas"""
+        return intervalo_confianza([getattr(r, metrica) for r in self.replicas], confianza)
+
+
+def generar_candidatos(
+    limites: LimitesCajas,
+    costos: CostosOperacionales
+) -> List[Candidato]:
+    """Configuraciones dentro de los límites, de la más barata a la más cara
+    
+    Se exige al menos una caja humana o automática: las rápidas solas no
+    pueden atender a los clientes con muchos productos.
+    """
+    candidatos = []
+    for humanas, automaticas, rapidas in product(
+        range(limites.max_humanas + 1),
+        range(limites.max_automaticas + 1),
+        range(limites.max_rapidas + 1)
+    ):
+        if humanas + automaticas == 0 or humanas + automaticas + rapidas > limites.max_total:
+            continue
+        config = ConfiguracionCajas(humanas, automaticas, rapidas)
+        costo = costos.calcular_costo_hora(config)
+        if limites.presupuesto_hora is not None and costo > limites.presupuesto_hora:
+            continue
+        candidatos.append(Candidato(config, costo))
+    
+    candidatos.sort(key=lambda c: (c.costo_hora, c.config.total_cajas()))
+    return candidatos
+
+
+class OptimizadorCajas:
+    """Busca la configuración más barata que cumple los SLA de abandono y espera
+    
+    Cada ronda simula a los candidatos vivos hasta `n` réplicas (con las
+    mismas semillas para todos) y luego:
+      1. descarta los que incumplen un SLA con la confianza pedida;
+      2. marca como dominados los más caros que los `mejores` factibles ya
+         confirmados (el costo por hora es exacto, no se estima);
+      3. conserva solo la fracción 1/`factor` con menor costo penalizado por
+         el incumplimiento promedio (halving sucesivo),
+    y multiplica `n` por `factor` para la siguiente. Así la mayoría de las
+    réplicas se gasta en los candidatos prometedores y dudosos.
+    
+    Con `margen_prefiltro` (desactivado por defecto) no se simulan los
+    candidatos cuya espera promedio analítica ya excede el SLA de espera
+    por ese factor. La aproximación no acota a la simulación (con sobrecarga
+    puede sobrestimar la espera), así que el margen es un factor de
+    seguridad, no una garantía: conviene validarlo contra una búsqueda con
+    margen_prefiltro=None para los SLA y límites en uso.
+    """
+    
+    def __init__(
+        self,
+        restricciones: Optional[RestriccionesServicio] = None,
+        limites: Optional[LimitesCajas] = None,
+        costos: Optional[CostosOperacionales] = None,
+        config_sim: Optional[ConfiguracionSimulacion] = None,
+        politica: str = "balanceada",
+        alta_demanda: bool = True,
+        motor: str = "heap",
+        muestreo: str = "bloques",
+        modo_estadisticas: str = "streaming",
+        semilla: Optional[int] = None,
+        margen_prefiltro: Optional[float] = None,
+        cache: Optional[CacheResultados] = None
+    ):
+        self.restricciones = restricciones or RestriccionesServicio()
+        self.limites = limites or LimitesCajas()
+        self.costos = costos or CostosOperacionales()
+        self.config_sim = config_sim or ConfiguracionSimulacion()
+        self.politica = politica
+        self.alta_demanda = alta_demanda
+        self.motor = motor
+        self.muestreo = muestreo
+        self.modo_estadisticas = modo_estadisticas
+        self.semilla = semilla if semilla is not None else generar_semillas(1)[0]
+        self.margen_prefiltro = margen_prefiltro  # None = simular todos los candidatos
+        self.cache = cache
+        self.candidatos: List[Candidato] = []
+        self.confianza = 0.95
+    
+    def _crear_tarea(self, config: ConfiguracionCajas, semilla: int) -> TareaReplica:
+        """Tarea de una réplica de un candidato"""
+        return TareaReplica(
+            config_sim=self.config_sim,
+            config_cajas=config,
+            politica=self.politica,
+            alta_demanda=self.alta_demanda,
+            semilla=semilla,
+            costos=self.costos,
+            motor=self.motor,
+            muestreo=self.muestreo,
+            modo_estadisticas=self.modo_estadisticas
+        )
+    
+    def _limites_sla(self) -> Dict[str, float]:
+        """Límite de cada métrica restringida"""
+        return {
+            'tasa_abandono': self.restricciones.max_tasa_abandono,
+            'tiempo_espera_promedio': self.restricciones.max_espera_promedio,
+        }
+    
+    def _clasificar(self, candidato: Candidato) -> Optional[str]:
+        """FACTIBLE o INFACTIBLE si los intervalos lo deciden, None si no"""
+        factible = True
+        for metrica, limite in self._limites_sla().items():
+            media, semiancho = candidato.intervalo(metrica, self.confianza)
+            if media - semiancho > limite:
+                return INFACTIBLE
+            if media + semiancho > limite:
+                factible = False
+        return FACTIBLE if factible else None
+    
+    def _prefiltrar(self, candidatos: List[Candidato]) -> List[Candidato]:
+        """Marca como PREFILTRADO a los claramente infactibles y devuelve el resto"""
+        if self.margen_prefiltro is None:
+            return list(candidatos)
+        vivos = []
+        for candidato in candidatos:
+            aproximacion = aproximar(
+                candidato.config, self.config_sim, self.politica, self.alta_demanda
+            )
+            if claramente_infactible(
+                aproximacion,
+                self.restricciones.max_espera_promedio,
+                self.margen_prefiltro
+            ):
+                candidato.estado = PREFILTRADO
+            else:
+                vivos.append(candidato)
+        return vivos
+    
+    def _penalizacion(self, candidato: Candidato) -> float:
+        """Costo por hora inflado por el incumplimiento relativo promedio"""
+        exceso = max(
+            candidato.intervalo(metrica, self.confianza)[0] / limite - 1.0
+            for metrica, limite in self._limites_sla().items()
+        )
+        return candidato.costo_hora * (1.0 + 10.0 * max(exceso, 0.0))
+    
+    def _simular(self, candidatos: List[Candidato], semillas: List[int], workers: Optional[int]):
+        """Completa las réplicas de cada candidato hasta len(semillas), en un solo pool"""
+        tareas = []
+        for indice, candidato in enumerate(candidatos):
+            for semilla in semillas[len(candidato.replicas):]:
+                tareas.append((indice, self._crear_tarea(candidato.config, semilla)))
+        tareas.sort(key=lambda t: costo_estimado(t[1]), reverse=True)
+        
+        nuevas: Dict[int, List[ResumenReplica]] = {}
+        for indice, (resumen, _) in ejecutar_replicas_en_flujo(tareas, workers, self.cache):
+            nuevas.setdefault(indice, []).append(resumen)
+        
+        orden = {semilla: i for i, semilla in enumerate(semillas)}
+        for indice, resumenes in nuevas.items():
+            candidato = candidatos[indice]
+            candidato.replicas.extend(resumenes)
+            candidato.replicas.sort(key=lambda r: orden[r.semilla])
+    
+    def optimizar(
+        self,
+        repeticiones_iniciales: int = 4,
+        max_repeticiones: int = 32,
+        factor: int = 2,
+        mejores: int = 5,
+        confianza: float = 0.95,
+        workers: Optional[int] = None,
+        verbose: bool = True
+    ) -> List[Candidato]:
+        """Ejecuta el halving sucesivo y devuelve los `mejores` candidatos factibles o probables"""
+        self.confianza = confianza
+        self.candidatos = generar_candidatos(self.limites, self.costos)
+        semillas = generar_semillas(max_repeticiones, self.semilla)
+        
+        vivos = self._prefiltrar(self.candidatos)
+        if verbose:
+            print(f"  Prefiltro analítico: {len(vivos)} de {len(self.candidatos)} candidatos a simular")
+        n = min(max(repeticiones_iniciales, 2), max_repeticiones)
+        ronda = 0
+        while vivos:
+            ronda += 1
+            self._simular(vivos, semillas[:n], workers)
+            for candidato in vivos:
+                candidato.ronda = ronda
+                candidato.estado = self._clasificar(candidato)
+            
+            # Un factible confirmado ya no necesita más réplicas
+            confirmados = sorted(
+                (c for c in self.candidatos if c.estado == FACTIBLE),
+                key=lambda c: c.costo_hora
+            )
+            vivos = [c for c in vivos if c.estado is None]
+            if len(confirmados) >= mejores:
+                costo_corte = confirmados[mejores - 1].costo_hora
+                for candidato in vivos:
+                    if candidato.costo_hora > costo_corte:
+                        candidato.estado = DOMINADO
+                vivos = [c for c in vivos if c.estado is None]
+            
+            if verbose:
+                print(f"  Ronda {ronda}: {n} réplicas, {len(confirmados)} factibles, "
+                      f"{len(vivos)} por decidir")
+            
+            if n >= max_repeticiones:
+                break
+            
+            vivos.sort(key=self._penalizacion)
+            conservar = max(math.ceil(len(vivos) / factor), mejores)
+            for candidato in vivos[conservar:]:
+                candidato.estado = DESCARTADO
+            vivos = vivos[:conservar]
+            n = min(n * factor, max_repeticiones)
+        
+        # Los que llegaron al máximo sin decidirse se juzgan por su media
+        for candidato in vivos:
+            cumple = all(
+                candidato.intervalo(metrica, confianza)[0] <= limite
+                for metrica, limite in self._limites_sla().items()
+            )
+            candidato.estado = PROBABLE if cumple else INFACTIBLE
+        
+        return self.mejores_candidatos(mejores)
+    
+    def mejores_candidatos(self, cantidad: int = 5) -> List[Candidato]:
+        """Los candidatos factibles (o probables) más baratos"""
+        elegibles = [c for c in self.candidatos if c.estado in (FACTIBLE, PROBABLE)]
+        elegibles.sort(key=lambda c: (c.estado != FACTIBLE, c.costo_hora))
+        return elegibles[:cantidad]
+    
+    def obtener_tabla(self, candidatos: Optional[List[Candidato]] = None) -> pd.DataFrame:
+        """Tabla de candidatos con sus intervalos de confianza"""
+        if candidatos is None:
+            candidatos = self.mejores_candidatos()
+        filas = []
+        for c in candidatos:
+            espera, ic_espera = c.intervalo('tiempo_espera_promedio', self.confianza)
+            abandono, ic_abandono = c.intervalo('tasa_abandono', self.confianza)
+            filas.append({
+                'Configuración': c.config.descripcion(),
+                'Costo/Hora': c.costo_hora,
+                'Estado': c.estado,
+                'Réplicas': len(c.replicas),
+                'Espera Promedio': espera,
+                f'IC{self.confianza:.0%} Espera ±': ic_espera,
+                'Tasa Abandono %': abandono,
+                f'IC{self.confianza:.0%} Abandono ±': ic_abandono,
+            })
+        return pd.DataFrame(filas)
+    
+    def resumen_busqueda(self) -> Dict[str, int]:
+        """Candidatos por estado y réplicas totales ejecutadas"""
+        resumen: Dict[str, int] = {}
+        for c in self.candidatos:
+            resumen[c.estado] = resumen.get(c.estado, 0) + 1
+        resumen['replicas'] = sum(len(c.replicas) for c in self.candidatos)
+        return resumen
+
+
+def main():
+    """Configuración más barata que cumple los SLA en hora pico"""
+    print("=" * 60)
+    print("OPTIMIZACIÓN DE CAJAS - SuperLatino (hora pico)")
+    print("=" * 60)
+    optimizador = OptimizadorCajas(semilla=42)
+    optimizador.optimizar(workers=os.cpu_count())
+    print(optimizador.obtener_tabla().to_string(index=False))
+    print(optimizador.resumen_busqueda())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Ejecución de réplicas independientes, en serie o en un pool de procesos
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple, TYPE_CHECKING
+import numpy as np
+from scipy.stats import t as t_student
+
+from config import ConfiguracionSimulacion, ConfiguracionCajas, CostosOperacionales
+from simulacion.supermercado import Supermercado
+from simulacion.estadisticas import EstadisticasSimulacion
+from simulacion.acumuladores import BocetoCuantiles
+
+if TYPE_CHECKING:
+    from analisis.cache import CacheResultados
+
+
+# Controles usados por defecto (los de mayor correlación con la espera)
+CONTROLES_POR_DEFECTO = ('intervalo', 'servicio_relativo', 'productos')
+
+
+@dataclass
+class ResumenReplica:
+    """KPIs compactos de una réplica (lo único que viaja entre procesos)"""
+    semilla: int
+    antitetico: bool  # Segunda corrida (reflejada) del par de su semilla
+    clientes_totales: int
+    clientes_atendidos: int
+    clientes_abandonaron: int
+    tasa_abandono: float
+    tiempo_espera_promedio: float
+    tiempo_espera_maximo: float
+    tiempo_servicio_promedio: float
+    tiempo_sistema_promedio: float
+    costo_beneficio: Dict[str, float]
+    boceto_espera: BocetoCuantiles  # Se combina entre réplicas para los percentiles
+    desvios_entradas: Dict[str, float]  # Media observada − teórica de cada control
+    
+    @classmethod
+    def desde_estadisticas(
+        cls,
+        stats: EstadisticasSimulacion,
+        semilla: int,
+        costo_beneficio: Dict[str, float],
+        antitetico: bool = False,
+        desvios_entradas: Optional[Dict[str, float]] = None
+    ) -> 'ResumenReplica':
+        """Extrae el resumen de las estadísticas completas de una corrida"""
+        return cls(
+            semilla=semilla,
+            antitetico=antitetico,
+            clientes_totales=stats.clientes_totales,
+            clientes_atendidos=stats.clientes_atendidos,
+            clientes_abandonaron=stats.clientes_abandonaron,
+            tasa_abandono=float(stats.tasa_abandono),
+            tiempo_espera_promedio=float(stats.tiempo_espera_promedio),
+            tiempo_espera_maximo=float(stats.tiempo_espera_maximo),
+            tiempo_servicio_promedio=float(stats.tiempo_servicio_promedio),
+            tiempo_sistema_promedio=float(stats.tiempo_sistema_promedio),
+            costo_beneficio=costo_beneficio,
+            boceto_espera=stats.boceto_espera,
+            desvios_entradas=desvios_entradas or {}
+        )
+
+
+@dataclass
+class TareaReplica:
+    """Parámetros de una réplica (serializable para enviarla a otro proceso)"""
+    config_sim: ConfiguracionSimulacion
+    config_cajas: ConfiguracionCajas
+    politica: str
+    alta_demanda: bool
+    semilla: int
+    costos: CostosOperacionales
+    incluir_stats: bool = False  # Devolver también las estadísticas completas
+    motor: str = "simpy"
+    muestreo: str = "escalar"
+    modo_estadisticas: str = "completas"
+    antitetico: bool = False
+
+
+def costo_estimado(tarea: TareaReplica) -> float:
+    """Clientes esperados de una réplica (aproxima su tiempo de cómputo)"""
+    config = tarea.config_sim
+    tasa = config.tasa_llegada_alta if tarea.alta_demanda else config.tasa_llegada_normal
+    return tasa * config.duracion_simulacion
+
+
+def generar_semillas(repeticiones: int, semilla: Optional[int] = None) -> List[int]:
+    """Deriva una semilla independiente por réplica a partir de una semilla base"""
+    hijas = np.random.SeedSequence(semilla).spawn(repeticiones)
+    return [int(h.generate_state(1)[0]) for h in hijas]
+
+
+def intervalo_confianza(
+    valores: Sequence[float],
+    confianza: float = 0.95
+) -> Tuple[float, float]:
+    """Media y semiancho del intervalo t de Student (semiancho infinito con n < 2)"""
+    n = len(valores)
+    if n == 0:
+        return 0.0, math.inf
+    media = float(np.mean(valores))
+    if n < 2:
+        return media, math.inf
+    error_estandar = np.std(valores, ddof=1) / math.sqrt(n)
+    return media, float(t_student.ppf((1 + confianza) / 2, n - 1) * error_estandar)
+
+
+def _promedios_por_semilla(
+    replicas: Sequence[ResumenReplica],
+    valor: Callable[[ResumenReplica], np.ndarray]
+) -> List[np.ndarray]:
+    """Promedia `valor` entre las réplicas de cada semilla (en orden de aparición)"""
+    por_semilla: Dict[int, List[np.ndarray]] = {}
+    for replica in replicas:
+        por_semilla.setdefault(replica.semilla, []).append(valor(replica))
+    return [np.mean(valores, axis=0) for valores in por_semilla.values()]
+
+
+def observaciones_independientes(
+    replicas: Sequence[ResumenReplica],
+    metrica: str = "tiempo_espera_promedio"
+) -> List[float]:
+    """Un valor por semilla: las dos corridas de un par antitético se promedian
+    
+    Las corridas de un par están correlacionadas (negativamente, a propósito),
+    así que la varianza debe estimarse sobre las medias de los pares. Sin
+    pares cada réplica es su propia observación.
+    """
+    return [float(v) for v in _promedios_por_semilla(replicas, lambda r: getattr(r, metrica))]
+
+
+def estimar_con_control(
+    replicas: Sequence[ResumenReplica],
+    metrica: str = "tiempo_espera_promedio",
+    controles: Sequence[str] = CONTROLES_POR_DEFECTO,
+    confianza: float = 0.95
+) -> Dict:
+    """Estimador con variables de control de la media de una métrica
+    
+    Regresa la métrica sobre los desvíos de las entradas (media observada −
+    teórica, de esperanza cero) con coeficientes estimados por mínimos
+    cuadrados; el intercepto es la media ajustada. Devuelve media, semiancho,
+    coeficientes y la reducción de varianza frente a la media simple.
+    """
+    y = np.array(observaciones_independientes(replicas, metrica))
+    c = np.array(_promedios_por_semilla(
+        replicas, lambda r: np.array([r.desvios_entradas[nombre] for nombre in controles])
+    )).reshape(len(y), len(controles))
+    n, q = c.shape
+    grados = n - q - 1
+    if grados < 1:
+        raise ValueError(
+            f"Se necesitan al menos {q + 2} observaciones independientes para {q} controles"
+        )
+    
+    x = np.column_stack([np.ones(n), c])
+    coeficientes = np.linalg.lstsq(x, y, rcond=None)[0]
+    residuos = y - x @ coeficientes
+    varianza_media = (residuos @ residuos / grados) * np.linalg.pinv(x.T @ x)[0, 0]
+    varianza_simple = np.var(y, ddof=1) / n
+    
+    return {
+        'media': float(coeficientes[0]),
+        'semiancho': float(t_student.ppf((1 + confianza) / 2, grados) * math.sqrt(varianza_media)),
+        'coeficientes': dict(zip(controles, coeficientes[1:].tolist())),
+        'reduccion_varianza': float(varianza_simple / varianza_media) if varianza_media > 0 else math.inf,
+        'observaciones': n
+    }
+
+
+def ejecutar_replica(
+    tarea: TareaReplica
+) -> Tuple[ResumenReplica, Optional[EstadisticasSimulacion]]:
+    """Ejecuta una réplica y devuelve su resumen (y opcionalmente las estadísticas)"""
+    supermercado = Supermercado(
+        config_sim=tarea.config_sim,
+        config_cajas=tarea.config_cajas,
+        politica=tarea.politica,
+        alta_demanda=tarea.alta_demanda,
+        semilla=tarea.semilla,
+        motor=tarea.motor,
+        muestreo=tarea.muestreo,
+        modo_estadisticas=tarea.modo_estadisticas,
+        antitetico=tarea.antitetico
+    )
+    stats = supermercado.ejecutar()
+    
+    duracion_horas = tarea.config_sim.duracion_simulacion / 60.0
+    costo_beneficio = stats.calcular_costo_beneficio(
+        tarea.config_cajas, duracion_horas, tarea.costos
+    )
+    desvios = stats.entradas.desvios(tarea.config_sim, supermercado.tasa_llegada)
+    resumen = ResumenReplica.desde_estadisticas(
+        stats, tarea.semilla, costo_beneficio, tarea.antitetico, desvios
+    )
+    
+    return resumen, (stats if tarea.incluir_stats else None)
+
+
+def ejecutar_replicas(
+    tareas: List[TareaReplica],
+    workers: Optional[int] = None,
+    cache: Optional['CacheResultados'] = None
+) -> List[Tuple[ResumenReplica, Optional[EstadisticasSimulacion]]]:
+    """Ejecuta las tareas en orden; con workers > 1 las reparte en procesos"""
+    if cache is not None:
+        resultados = dict(ejecutar_replicas_en_flujo(list(enumerate(tareas)), workers, cache))
+        return [resultados[i] for i in range(len(tareas))]
+    
+    if not workers or workers <= 1 or len(tareas) <= 1:
+        return [ejecutar_replica(t) for t in tareas]
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(tareas))) as pool:
+        return list(pool.map(ejecutar_replica, tareas))
+
+
+def ejecutar_replicas_en_flujo(
+    tareas: List[Tuple[Hashable, TareaReplica]],
+    workers: Optional[int] = None,
+    cache: Optional['CacheResultados'] = None
+) -> Iterator[Tuple[Hashable, Tuple[ResumenReplica, Optional[EstadisticasSimulacion]]]]:
+    """Ejecuta tareas etiquetadas y entrega cada resultado apenas termina
+    
+    Las tareas se envían al pool en el orden recibido; cada proceso toma la
+    siguiente en cuanto queda libre, así que conviene ordenarlas de mayor a
+    menor costo. Con `cache` los resúmenes ya guardados se entregan primero
+    sin simular (salvo las tareas que piden las estadísticas completas) y
+    los nuevos se guardan al llegar.
+    """
+    if cache is not None:
+        pendientes = []
+        for clave, tarea in tareas:
+            resumen = None if tarea.incluir_stats else cache.obtener(tarea)
+            if resumen is not None:
+                yield clave, (resumen, None)
+            else:
+                pendientes.append((clave, tarea))
+        
+        por_clave = dict(pendientes)
+        for clave, resultado in ejecutar_replicas_en_flujo(pendientes, workers):
+            cache.guardar(por_clave[clave], resultado[0])
+            yield clave, resultado
+        return
+    
+    if not workers or workers <= 1 or len(tareas) <= 1:
+        for clave, tarea in tareas:
+            yield clave, ejecutar_replica(tarea)
+        return
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(tareas))) as pool:
+        futuros = {pool.submit(ejecutar_replica, tarea): clave for clave, tarea in tareas}
+        for futuro in as_completed(futuros):
+            yield futuros[futuro], futuro.result()
@@ -15,6 +15,7 @@ from datetime import datetime
 from config import COLORES, TipoCaja
 from simulacion.estadisticas import EstadisticasSimulacion
 from .comparador import ComparadorEscenarios
+from .exportador import ExportadorParquet
 
 
 class GeneradorReportes:
@@ -38,8 +39,9 @@ class GeneradorReportes:
         """Genera histograma de tiempos de espera"""
         fig, ax = plt.subplots(figsize=(10, 6))
         
-        if stats._tiempos_espera:
-            ax.hist(stats._tiempos_espera, bins=25, color='#3498db', 
+        tiempos_espera = stats._tiempos_espera
+        if tiempos_espera.size:
+            ax.hist(tiempos_espera, bins=25, color='#3498db', 
                    edgecolor='white', alpha=0.8)
             ax.axvline(stats.tiempo_espera_promedio, color='#e74c3c', 
                       linestyle='--', linewidth=2, 
@@ -68,9 +70,10 @@ class GeneradorReportes:
         """Genera gráfica de evolución temporal de colas"""
         fig, ax = plt.subplots(figsize=(12, 5))
         
-        if stats.historico_cola:
-            tiempos = [h[0] for h in stats.historico_cola]
-            colas = [h[1] for h in stats.historico_cola]
+        historico = stats.historico_cola
+        if historico:
+            tiempos = [h[0] for h in historico]
+            colas = [h[1] for h in historico]
             
             ax.fill_between(tiempos, colas, alpha=0.3, color='#3498db')
             ax.plot(tiempos, colas, color='#2980b9', linewidth=1.5)
@@ -216,6 +219,7 @@ class GeneradorReportes:
         
         # Pie chart de clientes por tipo
         por_tipo = df_atendidos['tipo_caja'].value_counts()
+        por_tipo = por_tipo[por_tipo > 0]
         colores_tipo = {
             'humana': '#3498db',
             'automatica': '#2ecc71', 
@@ -284,6 +288,18 @@ class GeneradorReportes:
         
         print(f"\n✅ Reporte completo generado en: {self.directorio}/")
     
+    def exportar_parquet(
+        self,
+        comparador: ComparadorEscenarios,
+        directorio: Optional[str] = None,
+        paso: float = 1.0
+    ) -> int:
+        """Exporta registros por cliente y series de cada escenario a Parquet (requiere pyarrow)"""
+        exportador = ExportadorParquet(directorio or os.path.join(self.directorio, "parquet"))
+        filas = exportador.exportar_resultados(comparador.resultados, paso)
+        print(f"🗄️  Parquet: {filas} clientes en {len(exportador.archivos)} archivos ({exportador.directorio}/)")
+        return filas
+    
     def _generar_resumen_texto(
         self,
         comparador: ComparadorEscenarios,
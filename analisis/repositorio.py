@@ -0,0 +1,288 @@
+"""
+Repositorio persistente de corridas en SQLite (metadatos, réplicas y clientes)
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+
+from config import BASE_DIR, ConfiguracionCajas
+from simulacion.supermercado import VERSION_MOTOR
+from simulacion.estadisticas import (
+    EstadisticasSimulacion, DTYPE_REGISTRO, PERCENTILES_ESPERA, TIPOS_CAJA
+)
+from analisis.replicas import ResumenReplica
+
+
+RUTA_REPOSITORIO = os.path.join(BASE_DIR, "corridas.db")
+
+# Columnas de KPIs por réplica (se validan antes de usarlas en una consulta)
+METRICAS_REPLICA = (
+    'clientes_totales', 'clientes_atendidos', 'clientes_abandonaron',
+    'tasa_abandono', 'tiempo_espera_promedio', 'tiempo_espera_maximo',
+    'tiempo_servicio_promedio', 'tiempo_sistema_promedio',
+) + tuple(f'tiempo_espera_p{p}' for p in PERCENTILES_ESPERA)
+
+_TIPOS_SQL = {'i': 'INTEGER', 'u': 'INTEGER', 'b': 'INTEGER', 'f': 'REAL'}
+
+ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS corridas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL,
+    escenario TEXT NOT NULL,
+    politica TEXT NOT NULL,
+    alta_demanda INTEGER NOT NULL,
+    cajas_humanas INTEGER NOT NULL,
+    cajas_automaticas INTEGER NOT NULL,
+    cajas_rapidas INTEGER NOT NULL,
+    duracion REAL NOT NULL,
+    motor TEXT,
+    muestreo TEXT,
+    semilla_base INTEGER,
+    origen TEXT,
+    version_motor TEXT NOT NULL,
+    fecha TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_corridas_escenario ON corridas (escenario);
+CREATE INDEX IF NOT EXISTS idx_corridas_politica ON corridas (politica);
+CREATE INDEX IF NOT EXISTS idx_corridas_demanda ON corridas (alta_demanda);
+CREATE INDEX IF NOT EXISTS idx_corridas_fecha ON corridas (fecha);
+
+CREATE TABLE IF NOT EXISTS replicas (
+    corrida_id INTEGER NOT NULL REFERENCES corridas (id) ON DELETE CASCADE,
+    indice INTEGER NOT NULL,
+    semilla INTEGER NOT NULL,
+    antitetico INTEGER NOT NULL,
+    {', '.join(f'{m} REAL' for m in METRICAS_REPLICA)},
+    costo_beneficio TEXT,
+    PRIMARY KEY (corrida_id, indice)
+);
+
+CREATE TABLE IF NOT EXISTS clientes (
+    corrida_id INTEGER NOT NULL REFERENCES corridas (id) ON DELETE CASCADE,
+    replica INTEGER NOT NULL,
+    {', '.join(f'{n} {_TIPOS_SQL[DTYPE_REGISTRO[n].kind]}' for n in DTYPE_REGISTRO.names)}
+);
+CREATE INDEX IF NOT EXISTS idx_clientes_corrida ON clientes (corrida_id, replica);
+"""
+
+
+class RepositorioCorridas:
+    """Corridas, KPIs por réplica y (opcionalmente) registros por cliente en SQLite
+    
+    La base usa WAL y espera hasta `timeout` segundos por el bloqueo, así que
+    varios procesos (p. ej. los de un pool de réplicas) pueden abrir su propio
+    repositorio sobre el mismo archivo e insertar a la vez. Dentro de un
+    proceso la conexión se comparte entre hilos con un candado.
+    """
+    
+    def __init__(
+        self,
+        ruta: str = RUTA_REPOSITORIO,
+        guardar_clientes: bool = False,
+        timeout: float = 30.0
+    ):
+        self.ruta = ruta
+        self.guardar_clientes = guardar_clientes  # Registros por cliente al guardar resultados
+        self._candado = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, timeout=timeout, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA foreign_keys=ON")
+        self._conexion.executescript(ESQUEMA)
+    
+    def cerrar(self):
+        """Cierra la conexión"""
+        self._conexion.close()
+    
+    # ==================== ESCRITURA ====================
+    
+    def crear_corrida(
+        self,
+        nombre: str,
+        config_cajas: ConfiguracionCajas,
+        politica: str,
+        alta_demanda: bool,
+        duracion: float,
+        escenario: Optional[str] = None,
+        motor: Optional[str] = None,
+        muestreo: Optional[str] = None,
+        semilla_base: Optional[int] = None,
+        origen: Optional[str] = None
+    ) -> int:
+        """Registra los metadatos de una corrida y devuelve su id"""
+        with self._candado, self._conexion:
+            cursor = self._conexion.execute(
+                "INSERT INTO corridas (nombre, escenario, politica, alta_demanda, "
+                "cajas_humanas, cajas_automaticas, cajas_rapidas, duracion, motor, "
+                "muestreo, semilla_base, origen, version_motor, fecha) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    nombre, escenario or config_cajas.descripcion(), politica, int(alta_demanda),
+                    config_cajas.cajas_humanas, config_cajas.cajas_automaticas,
+                    config_cajas.cajas_rapidas, duracion, motor, muestreo, semilla_base,
+                    origen, VERSION_MOTOR, datetime.now().isoformat(timespec='seconds')
+                )
+            )
+            return cursor.lastrowid
+    
+    def guardar_replicas(
+        self,
+        corrida_id: int,
+        replicas: Iterable[Tuple[int, ResumenReplica]]
+    ):
+        """Inserta (índice, resumen) de varias réplicas en una sola transacción"""
+        filas = []
+        for indice, r in replicas:
+            percentiles = [r.boceto_espera.cuantil(p / 100) for p in PERCENTILES_ESPERA]
+            filas.append((
+                corrida_id, indice, r.semilla, int(r.antitetico),
+                r.clientes_totales, r.clientes_atendidos, r.clientes_abandonaron,
+                r.tasa_abandono, r.tiempo_espera_promedio, r.tiempo_espera_maximo,
+                r.tiempo_servicio_promedio, r.tiempo_sistema_promedio,
+                *percentiles,
+                json.dumps(r.costo_beneficio)
+            ))
+        marcadores = ', '.join('?' * (len(METRICAS_REPLICA) + 5))
+        with self._candado, self._conexion:
+            self._conexion.executemany(
+                f"INSERT OR REPLACE INTO replicas VALUES ({marcadores})", filas
+            )
+    
+    def guardar_clientes_de(self, corrida_id: int, replica: int, stats: EstadisticasSimulacion):
+        """Inserta los registros por cliente de una réplica directamente desde sus columnas"""
+        columnas = [stats.tabla.columna(n).tolist() for n in DTYPE_REGISTRO.names]
+        filas = ((corrida_id, replica, *fila) for fila in zip(*columnas))
+        marcadores = ', '.join('?' * (len(DTYPE_REGISTRO.names) + 2))
+        with self._candado, self._conexion:
+            self._conexion.executemany(f"INSERT INTO clientes VALUES ({marcadores})", filas)
+    
+    def guardar_resultado(
+        self,
+        resultado: Dict,
+        duracion: float,
+        motor: Optional[str] = None,
+        muestreo: Optional[str] = None,
+        origen: Optional[str] = None
+    ) -> int:
+        """Guarda un resultado consolidado de ComparadorEscenarios con todas sus réplicas"""
+        corrida_id = self.crear_corrida(
+            nombre=resultado['nombre'],
+            config_cajas=resultado['config_cajas'],
+            politica=resultado['politica'],
+            alta_demanda=resultado['alta_demanda'],
+            duracion=duracion,
+            escenario=resultado.get('escenario'),
+            motor=motor,
+            muestreo=muestreo,
+            semilla_base=resultado.get('semilla_base'),
+            origen=origen
+        )
+        self.guardar_replicas(corrida_id, enumerate(resultado['replicas']))
+        stats = resultado.get('stats')
+        if self.guardar_clientes and stats is not None and len(stats.tabla):
+            indice = resultado.get('indice_stats', len(resultado['replicas']) - 1)
+            self.guardar_clientes_de(corrida_id, indice, stats)
+        return corrida_id
+    
+    # ==================== CONSULTAS ====================
+    
+    @staticmethod
+    def _filtros(
+        escenario: Optional[str] = None,
+        politica: Optional[str] = None,
+        alta_demanda: Optional[bool] = None,
+        origen: Optional[str] = None,
+        desde: Optional[str] = None,
+        hasta: Optional[str] = None
+    ) -> Tuple[str, List]:
+        """Cláusula WHERE sobre `corridas` (alias c) y sus parámetros"""
+        condiciones, parametros = [], []
+        for columna, valor in (('escenario', escenario), ('politica', politica), ('origen', origen)):
+            if valor is not None:
+                condiciones.append(f"c.{columna} = ?")
+                parametros.append(valor)
+        if alta_demanda is not None:
+            condiciones.append("c.alta_demanda = ?")
+            parametros.append(int(alta_demanda))
+        if desde is not None:
+            condiciones.append("c.fecha >= ?")
+            parametros.append(desde)
+        if hasta is not None:
+            condiciones.append("c.fecha < ?")
+            parametros.append(hasta)
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        return donde, parametros
+    
+    def _consultar(self, sql: str, parametros: List) -> pd.DataFrame:
+        """Ejecuta una consulta y la devuelve como DataFrame"""
+        with self._candado:
+            return pd.read_sql_query(sql, self._conexion, params=parametros)
+    
+    def corridas(self, **filtros) -> pd.DataFrame:
+        """Metadatos de las corridas (filtros: escenario, politica, alta_demanda, origen, desde, hasta)"""
+        donde, parametros = self._filtros(**filtros)
+        return self._consultar(f"SELECT * FROM corridas c {donde} ORDER BY c.fecha, c.id", parametros)
+    
+    def replicas(self, **filtros) -> pd.DataFrame:
+        """KPIs por réplica junto con los metadatos de su corrida"""
+        donde, parametros = self._filtros(**filtros)
+        return self._consultar(
+            "SELECT c.nombre, c.escenario, c.politica, c.alta_demanda, c.fecha, r.* "
+            f"FROM replicas r JOIN corridas c ON c.id = r.corrida_id {donde} "
+            "ORDER BY c.fecha, r.corrida_id, r.indice",
+            parametros
+        )
+    
+    def resumen_corridas(
+        self,
+        metrica: str = "tiempo_espera_promedio",
+        solo_ultimas: bool = False,
+        **filtros
+    ) -> pd.DataFrame:
+        """Una fila por corrida con la media de las réplicas de sus KPIs
+        
+        `metrica` agrega además su desviación estándar; con `solo_ultimas`
+        queda solo la corrida más reciente de cada nombre.
+        """
+        if metrica not in METRICAS_REPLICA:
+            raise ValueError(f"Métrica desconocida: {metrica} (opciones: {', '.join(METRICAS_REPLICA)})")
+        donde, parametros = self._filtros(**filtros)
+        if solo_ultimas:
+            condicion = f"c.id IN (SELECT MAX(c.id) FROM corridas c {donde} GROUP BY c.nombre)"
+            donde = f"WHERE {condicion}"
+        promedios = ', '.join(f"AVG(r.{m}) AS {m}" for m in METRICAS_REPLICA)
+        # Dos pasadas: desvíos respecto de la media de la corrida (E[x²] − E[x]²
+        # pierde toda la precisión cuando la varianza es chica frente a la media)
+        resumen = self._consultar(
+            f"SELECT c.*, COUNT(r.indice) AS replicas, {promedios}, "
+            f"SUM((r.{metrica} - m.media) * (r.{metrica} - m.media)) AS _desvios "
+            f"FROM corridas c JOIN replicas r ON r.corrida_id = c.id "
+            f"JOIN (SELECT corrida_id, AVG({metrica}) AS media FROM replicas GROUP BY corrida_id) m "
+            f"ON m.corrida_id = c.id {donde} "
+            "GROUP BY c.id ORDER BY c.fecha, c.id",
+            parametros
+        )
+        n = resumen['replicas']
+        resumen[f'{metrica}_desviacion'] = (resumen.pop('_desvios') / (n - 1).where(n > 1)) ** 0.5
+        return resumen
+    
+    def clientes(self, corrida_id: int, replica: Optional[int] = None) -> pd.DataFrame:
+        """Registros por cliente de una corrida (tipo_caja como categórica)"""
+        sql = "SELECT * FROM clientes WHERE corrida_id = ?"
+        parametros: List = [corrida_id]
+        if replica is not None:
+            sql += " AND replica = ?"
+            parametros.append(replica)
+        datos = self._consultar(sql, parametros)
+        if not datos.empty:
+            datos['abandono'] = datos['abandono'].astype(bool)
+            datos['tipo_caja'] = pd.Categorical.from_codes(
+                datos['tipo_caja'], categories=[t.value for t in TIPOS_CAJA]
+            )
+        return datos
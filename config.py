@@ -116,4 +116,5 @@ DASH_CONFIG = {
     "host": "127.0.0.1",
     "port": 8030,
     "debug": False,
+    "workers": None,  # Procesos para simulaciones en segundo plano (None = núcleos de la CPU)
 }
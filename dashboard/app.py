@@ -5,13 +5,17 @@ import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from dash import Dash, html, dcc, callback, Output, Input, State
+from dash import Dash, html, dcc, callback, ctx, Output, Input, State, Patch, no_update
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
+import numpy as np
 import threading
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 
 from config import (
     DASH_CONFIG, ESCENARIOS, ConfiguracionSimulacion,
@@ -19,50 +23,156 @@ from config import (
 )
 from simulacion.supermercado import Supermercado
 from simulacion.estadisticas import EstadisticasSimulacion
+from analisis.replicas import ResumenReplica, generar_semillas
+from analisis.repositorio import RepositorioCorridas
+from dashboard.trabajos import ColaTrabajos, SolicitudSimulacion, Trabajo, FALLIDO
+from dashboard.submuestreo import PUNTOS_GRAFICA, lttb, reducir_serie, rango_zoom
 
 
-# Variables globales para estado
-simulacion_activa = None
-resultados_escenarios = {}
+# Corridas persistidas: la comparación sobrevive a reinicios del servidor.
+# Se abre en crear_dashboard, así importar el módulo no crea ni toca la base.
+repositorio: Optional[RepositorioCorridas] = None
 
+INTERVALO_PROGRESO_MS = 500  # Frecuencia con que el navegador consulta el avance
+CLASES_HISTOGRAMA = 20  # Clases del histograma de esperas
+MAX_RENDERS = 16  # Corridas terminadas con figuras memorizadas
 
-def ejecutar_simulacion_background(escenario_nombre: str, config_cajas: ConfiguracionCajas, 
-                                   alta_demanda: bool, politica: str):
-    """Ejecuta simulación en segundo plano"""
-    global simulacion_activa, resultados_escenarios
+
+@dataclass
+class RenderCorrida:
+    """Componentes ya construidos de una corrida terminada"""
+    kpis: html.Div
+    espera: go.Figure
+    colas: go.Figure
+    throughput: go.Figure
+    tipos: go.Figure
+    series: Dict[str, Tuple[np.ndarray, np.ndarray]]  # Serie completa de cada gráfica, para el zoom
+    fila_comparacion: Dict[str, object]
+
+
+class MemoriaRenders:
+    """LRU acotado de RenderCorrida por clave de corrida (SolicitudSimulacion.clave)
     
-    config_sim = ConfiguracionSimulacion()
-    supermercado = Supermercado(
-        config_sim=config_sim,
-        config_cajas=config_cajas,
-        politica=politica,
-        alta_demanda=alta_demanda
-    )
+    Recuerda además la clave de la última corrida de cada nombre_sim, para
+    mostrarla al instante cuando se vuelve a elegir ese escenario.
+    """
     
-    simulacion_activa = supermercado
-    stats = supermercado.ejecutar()
+    def __init__(self, capacidad: int = MAX_RENDERS):
+        self.capacidad = capacidad
+        self._renders: 'OrderedDict[str, RenderCorrida]' = OrderedDict()
+        self._ultimas: Dict[str, str] = {}
+        self._lock = threading.Lock()
     
-    # Guardar resultados
-    resultados_escenarios[escenario_nombre] = {
-        'stats': stats,
-        'config': config_cajas,
-        'alta_demanda': alta_demanda,
-        'politica': politica
-    }
+    def obtener(self, clave: Optional[str]) -> Optional[RenderCorrida]:
+        """Render memorizado (lo marca como usado)"""
+        with self._lock:
+            render = self._renders.get(clave)
+            if render is not None:
+                self._renders.move_to_end(clave)
+            return render
+    
+    def guardar(self, clave: str, nombre_sim: str, render: RenderCorrida):
+        """Memoriza el render y desaloja los menos usados"""
+        with self._lock:
+            self._renders[clave] = render
+            self._renders.move_to_end(clave)
+            self._ultimas[nombre_sim] = clave
+            while len(self._renders) > self.capacidad:
+                self._renders.popitem(last=False)
+    
+    def ultima(self, nombre_sim: str) -> Optional[str]:
+        """Clave de la última corrida memorizada del escenario"""
+        with self._lock:
+            clave = self._ultimas.get(nombre_sim)
+            return clave if clave in self._renders else None
+
+
+memoria_renders = MemoriaRenders()
+
+
+def registrar_corrida(trabajo: Trabajo):
+    """Persiste una corrida terminada (lo llama la cola de trabajos)"""
+    solicitud = trabajo.solicitud
+    stats = trabajo.stats
+    
+    # Persistir la corrida con sus KPIs
+    duracion_horas = solicitud.config_sim.duracion_simulacion / 60.0
+    costo_beneficio = stats.calcular_costo_beneficio(solicitud.config_cajas, duracion_horas, CostosOperacionales())
+    corrida_id = repositorio.crear_corrida(
+        solicitud.nombre, solicitud.config_cajas, solicitud.politica, solicitud.alta_demanda,
+        solicitud.config_sim.duracion_simulacion, escenario=solicitud.escenario,
+        motor=trabajo.motor, muestreo=trabajo.muestreo,
+        semilla_base=solicitud.semilla, origen="dashboard"
+    )
+    repositorio.guardar_replicas(
+        corrida_id, [(0, ResumenReplica.desde_estadisticas(stats, solicitud.semilla, costo_beneficio))]
+    )
     
-    simulacion_activa = None
-    return stats
+    # Las figuras se construyen una vez, aquí, y se sirven desde la memoria
+    renderizar_corrida(trabajo)
+
+
+def renderizar_corrida(trabajo: Trabajo) -> RenderCorrida:
+    """Construye y memoriza KPIs y figuras de un trabajo completado"""
+    solicitud = trabajo.solicitud
+    stats = trabajo.stats
+    series = {
+        'cola': tuple(np.asarray(stats.historico_cola, dtype=float).reshape(-1, 2).T),
+        'throughput': tuple(np.asarray(stats.historico_throughput, dtype=float).reshape(-1, 2).T),
+    }
+    render = RenderCorrida(
+        kpis=crear_kpis(trabajo.kpis),
+        espera=crear_grafica_tiempo_espera(stats),
+        colas=crear_grafica_colas(stats),
+        throughput=crear_grafica_throughput(stats),
+        tipos=crear_grafica_por_tipo_caja(stats),
+        series=series,
+        fila_comparacion={
+            'nombre': solicitud.nombre,
+            'valores': [
+                float(trabajo.kpis['tiempo_espera_promedio']),
+                float(trabajo.kpis['tasa_abandono']),
+                float(trabajo.kpis['throughput']),
+                CostosOperacionales().calcular_costo_hora(solicitud.config_cajas),
+            ],
+        }
+    )
+    memoria_renders.guardar(solicitud.clave, solicitud.nombre, render)
+    return render
+
+
+# Pool de procesos compartido por todas las sesiones del navegador
+cola_trabajos = ColaTrabajos(workers=DASH_CONFIG['workers'], al_completar=registrar_corrida)
+
+
+def enviar_simulacion(escenario_nombre: str, config_cajas: ConfiguracionCajas,
+                      alta_demanda: bool, politica: str, escenario: str = None) -> Tuple[str, str]:
+    """Encola la simulación en segundo plano y devuelve el id del trabajo y la clave de la corrida"""
+    solicitud = SolicitudSimulacion(
+        nombre=escenario_nombre,
+        config_cajas=config_cajas,
+        politica=politica,
+        alta_demanda=alta_demanda,
+        semilla=generar_semillas(1)[0],
+        escenario=escenario
+    )
+    return cola_trabajos.enviar(solicitud), solicitud.clave
 
 
 def crear_grafica_tiempo_espera(stats: EstadisticasSimulacion):
     """Crea histograma de tiempos de espera"""
-    if not stats._tiempos_espera:
+    tiempos_espera = stats._tiempos_espera
+    if not tiempos_espera.size:
         return go.Figure()
     
+    # Se envían solo los bordes y conteos de las clases, no cada tiempo de espera
+    conteos, bordes = np.histogram(tiempos_espera, bins=CLASES_HISTOGRAMA)
+    
     fig = go.Figure()
-    fig.add_trace(go.Histogram(
-        x=stats._tiempos_espera,
-        nbinsx=20,
+    fig.add_trace(go.Bar(
+        x=(bordes[:-1] + bordes[1:]) / 2,
+        y=conteos,
+        width=np.diff(bordes),
         marker_color='#3498db',
         name='Tiempo de espera'
     ))
@@ -74,21 +184,27 @@ def crear_grafica_tiempo_espera(stats: EstadisticasSimulacion):
         title="Distribución de Tiempos de Espera",
         xaxis_title="Tiempo (minutos)",
         yaxis_title="Frecuencia",
-        template="plotly_white"
+        template="plotly_white",
+        bargap=0
     )
     return fig
 
 
 def crear_grafica_colas(stats: EstadisticasSimulacion):
     """Crea gráfica de evolución de colas"""
-    if not stats.historico_cola:
+    historico = stats.historico_cola
+    if not historico:
         return go.Figure()
     
-    tiempos = [h[0] for h in stats.historico_cola]
-    colas = [h[1] for h in stats.historico_cola]
-    
+    # Solo viajan al navegador los puntos LTTB; el zoom re-agrega la ventana visible
+    tiempos, colas = lttb(*np.asarray(historico).T)
+    return crear_figura_colas(tiempos, colas)
+
+
+def crear_figura_colas(tiempos: np.ndarray, colas: np.ndarray):
+    """Figura de longitud de cola (vacía para recibir puntos con extendData)"""
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=tiempos, y=colas,
         mode='lines',
         fill='tozeroy',
@@ -108,14 +224,18 @@ def crear_grafica_colas(stats: EstadisticasSimulacion):
 
 def crear_grafica_throughput(stats: EstadisticasSimulacion):
     """Crea gráfica de throughput"""
-    if not stats.historico_throughput:
+    historico = stats.historico_throughput
+    if not historico:
         return go.Figure()
     
-    tiempos = [h[0] for h in stats.historico_throughput]
-    throughput = [h[1] for h in stats.historico_throughput]
-    
+    tiempos, throughput = lttb(*np.asarray(historico).T)
+    return crear_figura_throughput(tiempos, throughput)
+
+
+def crear_figura_throughput(tiempos: np.ndarray, throughput: np.ndarray):
+    """Figura de throughput (vacía para recibir puntos con extendData)"""
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=tiempos, y=throughput,
         mode='lines',
         line=dict(color='#2ecc71', width=2),
@@ -133,21 +253,10 @@ def crear_grafica_throughput(stats: EstadisticasSimulacion):
 
 def crear_grafica_por_tipo_caja(stats: EstadisticasSimulacion):
     """Crea gráfica de distribución por tipo de caja"""
-    df = stats.to_dataframe()
-    if df.empty:
-        return go.Figure()
-    
-    df_atendidos = df[~df['abandono']]
-    if df_atendidos.empty:
+    por_tipo = stats.por_tipo_caja()
+    if not por_tipo['clientes'].size:
         return go.Figure()
     
-    por_tipo = df_atendidos.groupby('tipo_caja').agg({
-        'id': 'count',
-        'tiempo_espera': 'mean',
-        'tiempo_servicio': 'mean'
-    }).reset_index()
-    por_tipo.columns = ['tipo_caja', 'clientes', 'espera_prom', 'servicio_prom']
-    
     colores = {'humana': '#3498db', 'automatica': '#2ecc71', 'rapida': '#f1c40f'}
     
     fig = make_subplots(rows=1, cols=2, 
@@ -162,7 +271,7 @@ def crear_grafica_por_tipo_caja(stats: EstadisticasSimulacion):
     
     fig.add_trace(go.Bar(
         x=por_tipo['tipo_caja'],
-        y=por_tipo['espera_prom'],
+        y=por_tipo['espera_promedio'],
         marker_color=[colores.get(t, '#95a5a6') for t in por_tipo['tipo_caja']],
         name='Tiempo espera',
         showlegend=False
@@ -173,32 +282,25 @@ def crear_grafica_por_tipo_caja(stats: EstadisticasSimulacion):
 
 
 def crear_grafica_comparacion_escenarios():
-    """Crea gráfica comparando escenarios ejecutados"""
-    global resultados_escenarios
+    """Crea gráfica comparando escenarios ejecutados (última corrida guardada de cada uno)"""
+    if repositorio is None:
+        return go.Figure()
+    corridas = repositorio.resumen_corridas(solo_ultimas=True, origen="dashboard")
     
-    if not resultados_escenarios:
+    if corridas.empty:
         return go.Figure()
     
-    nombres = []
-    esperas = []
-    abandonos = []
-    throughputs = []
-    costos = []
+    # Listas simples (no arreglos binarios) para que Patch pueda agregar o cambiar barras
+    nombres = corridas['nombre'].tolist()
+    esperas = corridas['tiempo_espera_promedio'].tolist()
+    abandonos = corridas['tasa_abandono'].tolist()
+    throughputs = (corridas['clientes_atendidos'] / (corridas['duracion'] / 60.0)).tolist()
     
-    for nombre, data in resultados_escenarios.items():
-        stats = data['stats']
-        config = data['config']
-        
-        nombres.append(nombre)
-        esperas.append(stats.tiempo_espera_promedio)
-        abandonos.append(stats.tasa_abandono)
-        
-        duracion_horas = 8.0
-        throughputs.append(stats.throughput(duracion_horas))
-        
-        costos_op = CostosOperacionales()
-        costo_hora = costos_op.calcular_costo_hora(config)
-        costos.append(costo_hora)
+    costos_op = CostosOperacionales()
+    costos = [
+        costos_op.calcular_costo_hora(ConfiguracionCajas(h, a, r))
+        for h, a, r in zip(corridas['cajas_humanas'], corridas['cajas_automaticas'], corridas['cajas_rapidas'])
+    ]
     
     fig = make_subplots(
         rows=2, cols=2,
@@ -224,8 +326,14 @@ def crear_grafica_comparacion_escenarios():
     return fig
 
 
-def crear_dashboard():
-    """Crea la aplicación Dash"""
+def crear_dashboard(repositorio_corridas: Optional[RepositorioCorridas] = None):
+    """Crea la aplicación Dash (abre el repositorio de corridas por defecto si no se pasa uno)"""
+    global repositorio
+    if repositorio_corridas is not None:
+        repositorio = repositorio_corridas
+    elif repositorio is None:
+        repositorio = RepositorioCorridas()
+    
     app = Dash(__name__, title="SuperLatino - Dashboard de Simulacion", suppress_callback_exceptions=True)
     
     app.layout = html.Div([
@@ -303,11 +411,15 @@ def crear_dashboard():
                                })
                 ], style={'width': '20%', 'display': 'inline-block', 'padding': '10px', 'textAlign': 'center'}),
             ], style={'display': 'flex', 'alignItems': 'center'}),
-            
+        
         ], style={'padding': '20px', 'backgroundColor': 'white', 'margin': '20px', 'borderRadius': '10px', 'boxShadow': '0 2px 5px rgba(0,0,0,0.1)'}),
         
-        # Estado de simulación
+        # Estado de simulación (trabajo de esta sesión y consulta periódica de su avance)
         html.Div(id='estado-simulacion', style={'textAlign': 'center', 'padding': '10px'}),
+        dcc.Store(id='trabajo-actual'),
+        dcc.Store(id='flujo-cursor'),  # Puntos en vivo ya enviados a las gráficas de esta sesión
+        dcc.Store(id='comparacion-nombres'),  # Escenarios (barras) en la comparación de esta sesión
+        dcc.Interval(id='intervalo-progreso', interval=INTERVALO_PROGRESO_MS, disabled=True),
         
         # KPIs principales
         html.Div(id='kpis-container', style={'padding': '20px'}),
@@ -337,7 +449,7 @@ def crear_dashboard():
             html.P("Ejecute multiples escenarios para compararlos", style={'textAlign': 'center', 'color': '#7f8c8d'}),
             dcc.Graph(id='grafica-comparacion')
         ], style={'padding': '20px', 'backgroundColor': 'white', 'margin': '20px', 'borderRadius': '10px'}),
-        
+    
     ], style={'fontFamily': 'Arial, sans-serif', 'backgroundColor': '#f5f6fa'})
     
     return app
@@ -346,62 +458,243 @@ def crear_dashboard():
 def registrar_callbacks(app):
     """Registra callbacks de la aplicación"""
     
+    @app.callback(
+        Output('trabajo-actual', 'data'),
+        [Input('btn-simular', 'n_clicks'),
+         Input('escenario-dropdown', 'value'),
+         Input('politica-dropdown', 'value'),
+         Input('demanda-radio', 'value')]
+    )
+    def seleccionar_trabajo(n_clicks, escenario, politica, demanda):
+        config_cajas = ESCENARIOS[escenario]
+        alta_demanda = demanda == 'alta'
+        
+        nombre_sim = f"{escenario}_{politica}_{'alta' if alta_demanda else 'normal'}"
+        
+        if ctx.triggered_id != 'btn-simular':
+            # Cambio de selección: la última corrida memorizada del escenario o,
+            # si no hay, el estado inicial (no quedan a la vista las de otro escenario)
+            clave = memoria_renders.ultima(nombre_sim)
+            if clave is None:
+                return None
+            return {'id': None, 'nombre': nombre_sim, 'clave': clave}
+        
+        trabajo_id, clave = enviar_simulacion(
+            nombre_sim, config_cajas, alta_demanda, politica, escenario=escenario
+        )
+        return {'id': trabajo_id, 'nombre': nombre_sim, 'clave': clave}
+    
     @app.callback(
         [Output('estado-simulacion', 'children'),
          Output('kpis-container', 'children'),
          Output('grafica-espera', 'figure'),
          Output('grafica-colas', 'figure'),
+         Output('grafica-colas', 'extendData'),
          Output('grafica-throughput', 'figure'),
+         Output('grafica-throughput', 'extendData'),
          Output('grafica-tipos', 'figure'),
-         Output('grafica-comparacion', 'figure')],
-        [Input('btn-simular', 'n_clicks')],
-        [State('escenario-dropdown', 'value'),
-         State('politica-dropdown', 'value'),
-         State('demanda-radio', 'value')]
+         Output('grafica-comparacion', 'figure'),
+         Output('intervalo-progreso', 'disabled'),
+         Output('flujo-cursor', 'data'),
+         Output('comparacion-nombres', 'data')],
+        [Input('intervalo-progreso', 'n_intervals'),
+         Input('trabajo-actual', 'data')],
+        [State('flujo-cursor', 'data'),
+         State('comparacion-nombres', 'data')]
     )
-    def ejecutar_y_mostrar(n_clicks, escenario, politica, demanda):
-        if not n_clicks:
-            # Estado inicial
+    def mostrar_trabajo(n_intervals, trabajo_actual, cursor, nombres):
+        if not trabajo_actual:
+            # Estado inicial; la comparación se construye solo si la sesión aún no la tiene
+            if nombres is None:
+                comparacion = crear_grafica_comparacion_escenarios()
+                nombres = nombres_comparacion(comparacion)
+            else:
+                comparacion = no_update
             return (
                 html.P("Configure y ejecute una simulacion", style={'color': '#7f8c8d'}),
                 html.Div(),
                 go.Figure(),
                 go.Figure(),
+                no_update,
                 go.Figure(),
+                no_update,
                 go.Figure(),
-                crear_grafica_comparacion_escenarios()
+                comparacion,
+                True,
+                None,
+                nombres
             )
         
-        # Ejecutar simulación
-        config_cajas = ESCENARIOS[escenario]
-        alta_demanda = demanda == 'alta'
+        nombre_sim = trabajo_actual['nombre']
+        render = memoria_renders.obtener(trabajo_actual.get('clave'))
+        trabajo = None if render or not trabajo_actual['id'] else cola_trabajos.obtener(trabajo_actual['id'])
+        sin_cambios = (no_update,) * 8
         
-        nombre_sim = f"{escenario}_{politica}_{'alta' if alta_demanda else 'normal'}"
+        if render is None and trabajo is None:
+            return (html.P(f"La simulacion {nombre_sim} ya no esta disponible", style={'color': '#7f8c8d'}),
+                    *sin_cambios, True, None, no_update)
         
-        stats = ejecutar_simulacion_background(
-            nombre_sim, config_cajas, alta_demanda, politica
-        )
+        if render is None and trabajo.estado == FALLIDO:
+            return (html.P(f"Error en {nombre_sim}: {trabajo.error}", style={'color': '#e74c3c', 'fontWeight': 'bold'}),
+                    *sin_cambios, True, None, no_update)
         
-        # Crear KPIs
-        kpis = html.Div([
-            html.Div([
-                crear_kpi_card("Clientes Atendidos", stats.clientes_atendidos, "#2ecc71"),
-                crear_kpi_card("Abandonos", stats.clientes_abandonaron, "#e74c3c"),
-                crear_kpi_card("Espera Promedio", f"{stats.tiempo_espera_promedio:.1f} min", "#3498db"),
-                crear_kpi_card("Tasa Abandono", f"{stats.tasa_abandono:.1f}%", "#e67e22"),
-                crear_kpi_card("Throughput", f"{stats.throughput(8.0):.0f}/hora", "#9b59b6"),
-            ], style={'display': 'flex', 'justifyContent': 'space-around', 'flexWrap': 'wrap'})
-        ])
+        if render is None and not trabajo.terminado:
+            # En curso: se agregan a las gráficas solo los puntos nuevos de esta sesión
+            nuevo = not cursor or cursor.get('id') != trabajo.id
+            if nuevo:
+                cursor = {'id': trabajo.id, 'cola': 0, 'throughput': 0}
+            extension_cola, cursor['cola'] = extender_serie(trabajo.puntos_cola, cursor['cola'])
+            extension_throughput, cursor['throughput'] = extender_serie(trabajo.puntos_throughput, cursor['throughput'])
+            return (
+                crear_estado_progreso(nombre_sim, trabajo),
+                crear_kpis(trabajo.kpis) if trabajo.kpis else no_update,
+                go.Figure() if nuevo else no_update,
+                crear_figura_colas([], []) if nuevo else no_update,
+                extension_cola,
+                crear_figura_throughput([], []) if nuevo else no_update,
+                extension_throughput,
+                go.Figure() if nuevo else no_update,
+                no_update,
+                False,
+                cursor,
+                no_update
+            )
         
+        if render is None:
+            # Completado pero aún sin memorizar (o ya desalojado): se construye aquí
+            render = renderizar_corrida(trabajo)
+        comparacion, nombres = actualizar_comparacion(render.fila_comparacion, nombres)
+        estado = html.P(f"Simulacion completada: {nombre_sim}", style={'color': '#2ecc71', 'fontWeight': 'bold'})
+        if trabajo is not None and trabajo.error_al_completar:
+            estado = html.Div([
+                estado,
+                html.P(f"No se pudo guardar la corrida: {trabajo.error_al_completar}", style={'color': '#e67e22'})
+            ])
         return (
-            html.P(f"Simulacion completada: {nombre_sim}", style={'color': '#2ecc71', 'fontWeight': 'bold'}),
-            kpis,
-            crear_grafica_tiempo_espera(stats),
-            crear_grafica_colas(stats),
-            crear_grafica_throughput(stats),
-            crear_grafica_por_tipo_caja(stats),
-            crear_grafica_comparacion_escenarios()
+            estado,
+            render.kpis,
+            render.espera,
+            render.colas,
+            no_update,
+            render.throughput,
+            no_update,
+            render.tipos,
+            comparacion,
+            True,
+            None,
+            nombres
         )
+    
+    @app.callback(
+        Output('grafica-colas', 'figure', allow_duplicate=True),
+        [Input('grafica-colas', 'relayoutData')],
+        [State('trabajo-actual', 'data')],
+        prevent_initial_call=True
+    )
+    def acercar_colas(relayout, trabajo_actual):
+        return reagregar_zoom(relayout, trabajo_actual, 'cola')
+    
+    @app.callback(
+        Output('grafica-throughput', 'figure', allow_duplicate=True),
+        [Input('grafica-throughput', 'relayoutData')],
+        [State('trabajo-actual', 'data')],
+        prevent_initial_call=True
+    )
+    def acercar_throughput(relayout, trabajo_actual):
+        return reagregar_zoom(relayout, trabajo_actual, 'throughput')
+
+
+def extender_serie(puntos: List[Tuple[float, float]], enviados: int):
+    """extendData con los puntos posteriores a `enviados` (LTTB) y el nuevo total enviado
+    
+    La traza se acota a PUNTOS_GRAFICA (los más antiguos se descartan en el
+    navegador); al terminar, la figura se rehace con el LTTB de toda la serie.
+    """
+    nuevos = puntos[enviados:]
+    if not nuevos:
+        return no_update, enviados
+    tiempos, valores = lttb(*np.asarray(nuevos).T)
+    return (dict(x=[tiempos.tolist()], y=[valores.tolist()]), [0], PUNTOS_GRAFICA), enviados + len(nuevos)
+
+
+def reagregar_zoom(relayout: dict, trabajo_actual: dict, serie: str):
+    """Patch con el LTTB de la ventana visible (o de toda la serie al volver a autorange)"""
+    desde, hasta, cambio = rango_zoom(relayout)
+    if not cambio or not trabajo_actual:
+        return no_update
+    render = memoria_renders.obtener(trabajo_actual.get('clave'))
+    if render is None or not render.series[serie][0].size:
+        return no_update
+    
+    tiempos, valores = reducir_serie(*render.series[serie], desde, hasta)
+    parche = Patch()
+    parche['data'][0]['x'] = tiempos.tolist()
+    parche['data'][0]['y'] = valores.tolist()
+    # El rango va en la figura para que el navegador conserve la vista al recibirla
+    for eje in ('xaxis', 'yaxis'):
+        inicio, fin, cambio_eje = rango_zoom(relayout, eje)
+        if not cambio_eje:
+            continue
+        if inicio is None:
+            parche['layout'][eje]['autorange'] = True
+        else:
+            parche['layout'][eje]['range'] = [inicio, fin]
+    return parche
+
+
+def nombres_comparacion(figura: go.Figure) -> List[str]:
+    """Escenarios (eje x) de la figura de comparación"""
+    return list(figura.data[0].x) if figura.data else []
+
+
+def actualizar_comparacion(fila: Dict[str, object], nombres: Optional[List[str]]):
+    """Patch que agrega o actualiza solo la barra de la corrida en las cuatro subgráficas
+    
+    Sin comparación previa en el navegador se construye la figura completa.
+    Devuelve la figura (o el Patch) y los escenarios que quedan en ella.
+    """
+    if not nombres:
+        comparacion = crear_grafica_comparacion_escenarios()
+        return comparacion, nombres_comparacion(comparacion)
+    
+    parche = Patch()
+    nombre = fila['nombre']
+    if nombre in nombres:
+        indice = nombres.index(nombre)
+        for traza, valor in enumerate(fila['valores']):
+            parche['data'][traza]['y'][indice] = valor
+    else:
+        for traza, valor in enumerate(fila['valores']):
+            parche['data'][traza]['x'].append(nombre)
+            parche['data'][traza]['y'].append(valor)
+        nombres = nombres + [nombre]
+    return parche, nombres
+
+
+def crear_estado_progreso(nombre_sim: str, trabajo: Trabajo):
+    """Avance de un trabajo en cola o en ejecución"""
+    if not trabajo.tiempo_simulado:
+        texto = f"Simulacion en cola: {nombre_sim}"
+    else:
+        texto = (f"Simulando {nombre_sim}: minuto {trabajo.tiempo_simulado:.0f} de {trabajo.duracion:.0f}, "
+                 f"{trabajo.clientes_procesados} clientes procesados")
+    return html.Div([
+        html.P(texto, style={'color': '#3498db', 'fontWeight': 'bold'}),
+        html.Progress(value=f"{trabajo.progreso:.3f}", max="1", style={'width': '40%'})
+    ])
+
+
+def crear_kpis(kpis: Dict[str, float]):
+    """Crea la fila de tarjetas de KPIs (ver trabajos.resumen_kpis)"""
+    return html.Div([
+        html.Div([
+            crear_kpi_card("Clientes Atendidos", kpis['clientes_atendidos'], "#2ecc71"),
+            crear_kpi_card("Abandonos", kpis['clientes_abandonaron'], "#e74c3c"),
+            crear_kpi_card("Espera Promedio", f"{kpis['tiempo_espera_promedio']:.1f} min", "#3498db"),
+            crear_kpi_card("Tasa Abandono", f"{kpis['tasa_abandono']:.1f}%", "#e67e22"),
+            crear_kpi_card("Throughput", f"{kpis['throughput']:.0f}/hora", "#9b59b6"),
+        ], style={'display': 'flex', 'justifyContent': 'space-around', 'flexWrap': 'wrap'})
+    ])
 
 
 def crear_kpi_card(titulo: str, valor, color: str):
@@ -428,11 +721,14 @@ def ejecutar_dashboard(debug: bool = False):
     print(f"\n🚀 Dashboard disponible en: http://{DASH_CONFIG['host']}:{DASH_CONFIG['port']}")
     print("   Presione Ctrl+C para detener\n")
     
-    app.run(
-        host=DASH_CONFIG['host'],
-        port=DASH_CONFIG['port'],
-        debug=debug
-    )
+    try:
+        app.run(
+            host=DASH_CONFIG['host'],
+            port=DASH_CONFIG['port'],
+            debug=debug
+        )
+    finally:
+        cola_trabajos.cerrar()
 
 
 if __name__ == "__main__":
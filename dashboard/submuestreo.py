@@ -0,0 +1,80 @@
+"""
+Submuestreo de series de tiempo para las gráficas (Largest-Triangle-Three-Buckets)
+"""
+from typing import Optional, Tuple
+import numpy as np
+
+
+# Puntos por traza: ~2 por píxel de una gráfica de media pantalla
+PUNTOS_GRAFICA = 1000
+
+
+def lttb(x: np.ndarray, y: np.ndarray, puntos: int = PUNTOS_GRAFICA) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce la serie a `puntos` puntos conservando su forma visual
+    
+    Conserva el primero y el último; del resto, reparte los puntos en
+    `puntos - 2` cubetas y de cada una elige el que forma el triángulo de
+    mayor área con el punto elegido en la cubeta anterior y el promedio de
+    la siguiente. Las series que ya caben se devuelven tal cual.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if puntos >= n or puntos < 3:
+        return x, y
+    
+    limites = np.linspace(1, n - 1, puntos - 1).astype(int)
+    elegidos = np.empty(puntos, dtype=int)
+    elegidos[0] = 0
+    elegidos[-1] = n - 1
+    
+    anterior = 0
+    for i in range(puntos - 2):
+        inicio, fin = limites[i], limites[i + 1]
+        if i + 2 < len(limites):
+            siguiente_x = x[fin:limites[i + 2]].mean()
+            siguiente_y = y[fin:limites[i + 2]].mean()
+        else:
+            siguiente_x, siguiente_y = x[-1], y[-1]
+        
+        area = np.abs(
+            (x[anterior] - siguiente_x) * (y[inicio:fin] - y[anterior])
+            - (x[anterior] - x[inicio:fin]) * (siguiente_y - y[anterior])
+        )
+        anterior = inicio + int(area.argmax())
+        elegidos[i + 1] = anterior
+    
+    return x[elegidos], y[elegidos]
+
+
+def reducir_serie(
+    x: np.ndarray,
+    y: np.ndarray,
+    desde: Optional[float] = None,
+    hasta: Optional[float] = None,
+    puntos: int = PUNTOS_GRAFICA
+) -> Tuple[np.ndarray, np.ndarray]:
+    """LTTB de la ventana [desde, hasta] (más un punto a cada lado para que la línea llegue a los bordes)"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    inicio = 0 if desde is None else max(int(np.searchsorted(x, desde, side='left')) - 1, 0)
+    fin = len(x) if hasta is None else min(int(np.searchsorted(x, hasta, side='right')) + 1, len(x))
+    return lttb(x[inicio:fin], y[inicio:fin], puntos)
+
+
+def rango_zoom(relayout: Optional[dict], eje: str = 'xaxis') -> Tuple[Optional[float], Optional[float], bool]:
+    """(desde, hasta, cambió) del eje según relayoutData de dcc.Graph
+    
+    Un rango explícito es un zoom; autorange (doble clic) vuelve a la serie
+    completa con (None, None); cualquier otro evento no cambia el eje.
+    """
+    if not relayout:
+        return None, None, False
+    if f'{eje}.range[0]' in relayout and f'{eje}.range[1]' in relayout:
+        return float(relayout[f'{eje}.range[0]']), float(relayout[f'{eje}.range[1]']), True
+    if f'{eje}.range' in relayout:
+        desde, hasta = relayout[f'{eje}.range']
+        return float(desde), float(hasta), True
+    if relayout.get(f'{eje}.autorange'):
+        return None, None, True
+    return None, None, False
@@ -0,0 +1,252 @@
+"""
+Cola local de trabajos de simulación para el dashboard (pool de procesos con avance en vivo)
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hashlib
+import json
+import math
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from multiprocessing import Manager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import ConfiguracionSimulacion, ConfiguracionCajas
+from simulacion.supermercado import Supermercado
+from simulacion.estadisticas import EstadisticasSimulacion
+
+
+# Estados de un trabajo
+PENDIENTE = "pendiente"
+EJECUTANDO = "ejecutando"
+COMPLETADO = "completado"
+FALLIDO = "fallido"
+
+MAX_TRABAJOS_TERMINADOS = 32  # Los terminados más antiguos se olvidan (y sus estadísticas)
+INTERVALO_PUBLICACION = 0.1  # Segundos reales entre mensajes de un trabajador
+
+
+@dataclass
+class SolicitudSimulacion:
+    """Parámetros de una corrida pedida desde el dashboard"""
+    nombre: str
+    config_cajas: ConfiguracionCajas
+    politica: str
+    alta_demanda: bool
+    semilla: int
+    escenario: Optional[str] = None
+    config_sim: ConfiguracionSimulacion = field(default_factory=ConfiguracionSimulacion)
+    
+    @property
+    def clave(self) -> str:
+        """Identidad de la corrida: nombre, semilla y hash de las configuraciones"""
+        contenido = {
+            'config_cajas': asdict(self.config_cajas),
+            'config_sim': asdict(self.config_sim),
+            'politica': self.politica,
+            'alta_demanda': self.alta_demanda,
+        }
+        texto = json.dumps(contenido, sort_keys=True, default=str)
+        return f"{self.nombre}:{self.semilla}:{hashlib.sha256(texto.encode('utf-8')).hexdigest()[:16]}"
+
+
+@dataclass
+class Trabajo:
+    """Estado de una corrida enviada a la cola"""
+    id: str
+    solicitud: SolicitudSimulacion
+    estado: str = PENDIENTE
+    tiempo_simulado: float = 0.0  # minutos
+    clientes_procesados: int = 0  # atendidos + abandonos
+    kpis: Dict[str, float] = field(default_factory=dict)  # Últimos KPIs recibidos
+    puntos_cola: List[Tuple[float, float]] = field(default_factory=list)  # (minuto, longitud)
+    puntos_throughput: List[Tuple[float, float]] = field(default_factory=list)  # (minuto, clientes/hora)
+    stats: Optional[EstadisticasSimulacion] = None
+    motor: Optional[str] = None
+    muestreo: Optional[str] = None
+    error: Optional[str] = None
+    error_al_completar: Optional[str] = None  # Falló al_completar (la corrida es válida)
+    creado: float = field(default_factory=time.time)
+    
+    @property
+    def duracion(self) -> float:
+        """Minutos a simular"""
+        return self.solicitud.config_sim.duracion_simulacion
+    
+    @property
+    def progreso(self) -> float:
+        """Fracción simulada (0-1)"""
+        if self.estado == COMPLETADO:
+            return 1.0
+        return min(self.tiempo_simulado / self.duracion, 1.0) if self.duracion > 0 else 0.0
+    
+    @property
+    def terminado(self) -> bool:
+        """Completado o fallido"""
+        return self.estado in (COMPLETADO, FALLIDO)
+
+
+def resumen_kpis(stats: EstadisticasSimulacion, duracion_horas: float) -> Dict[str, float]:
+    """KPIs de las tarjetas del dashboard"""
+    return {
+        'clientes_atendidos': stats.clientes_atendidos,
+        'clientes_abandonaron': stats.clientes_abandonaron,
+        'tiempo_espera_promedio': stats.tiempo_espera_promedio,
+        'tasa_abandono': stats.tasa_abandono,
+        'throughput': stats.throughput(duracion_horas),
+    }
+
+
+def simular_con_progreso(solicitud: SolicitudSimulacion, buzon):
+    """Ejecuta la corrida en el proceso trabajador transmitiendo su avance
+    
+    `buzon` es una cola de un Manager compartida con el proceso web. En el
+    primer minuto simulado y luego cada INTERVALO_PUBLICACION segundos, on_tick
+    envía el minuto, los clientes procesados, los KPIs acumulados y solo los
+    puntos de cola y throughput nuevos desde el mensaje anterior (las mismas
+    muestras por minuto que historico_cola e historico_throughput).
+    """
+    supermercado = Supermercado(
+        config_sim=solicitud.config_sim,
+        config_cajas=solicitud.config_cajas,
+        politica=solicitud.politica,
+        alta_demanda=solicitud.alta_demanda,
+        semilla=solicitud.semilla
+    )
+    
+    ultimo = {'minuto': 0.0, 'reloj': -math.inf}
+    
+    def publicar(ahora: float):
+        reloj = time.monotonic()
+        if reloj - ultimo['reloj'] < INTERVALO_PUBLICACION:
+            return
+        stats = supermercado.estadisticas
+        cola = stats.muestrear_cola(desde=ultimo['minuto'], hasta=ahora)
+        throughput = stats.muestrear_throughput(desde=ultimo['minuto'], hasta=ahora)
+        buzon.put({
+            'tiempo': ahora,
+            'clientes': stats.clientes_atendidos + stats.clientes_abandonaron,
+            'kpis': resumen_kpis(stats, ahora / 60.0),
+            'cola': cola,
+            'throughput': throughput,
+        })
+        ultimo['reloj'] = reloj
+        if cola:
+            ultimo['minuto'] = cola[-1][0]
+    
+    supermercado.on_tick = publicar
+    stats = supermercado.ejecutar()
+    return stats, supermercado.motor, supermercado.muestreo
+
+
+class ColaTrabajos:
+    """Pool de procesos que ejecuta corridas sin bloquear los callbacks de Dash
+    
+    `enviar` devuelve el id del trabajo al instante; `obtener` da su estado y
+    vacía en el trabajo los mensajes que su trabajador dejó en su buzón (los
+    puntos se acumulan, así cada sesión lee solo los que le faltan). Al
+    terminar cada trabajo se llama `al_completar(trabajo)` en el proceso web
+    (p. ej. para persistir la corrida), aunque nadie esté consultando.
+    """
+    
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        al_completar: Optional[Callable[[Trabajo], None]] = None,
+        max_terminados: int = MAX_TRABAJOS_TERMINADOS
+    ):
+        self.workers = workers
+        self.al_completar = al_completar
+        self.max_terminados = max_terminados
+        self._trabajos: Dict[str, Trabajo] = {}
+        self._buzones: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+    
+    def _iniciar(self):
+        """Arranca el pool y el Manager en el primer envío"""
+        if self._pool is None:
+            self._manager = Manager()
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+    
+    def enviar(self, solicitud: SolicitudSimulacion) -> str:
+        """Encola la corrida y devuelve su id"""
+        trabajo = Trabajo(id=uuid.uuid4().hex, solicitud=solicitud)
+        with self._lock:
+            self._iniciar()
+            self._trabajos[trabajo.id] = trabajo
+            self._buzones[trabajo.id] = self._manager.Queue()
+            futuro = self._pool.submit(simular_con_progreso, solicitud, self._buzones[trabajo.id])
+        futuro.add_done_callback(lambda f: self._terminar(trabajo, f))
+        return trabajo.id
+    
+    def _terminar(self, trabajo: Trabajo, futuro: Future):
+        """Recoge el resultado del trabajador y luego llama al_completar
+        
+        Un error de al_completar (p. ej. la base bloqueada) no invalida la
+        corrida: queda en `error_al_completar` y el trabajo sigue completado.
+        """
+        try:
+            trabajo.stats, trabajo.motor, trabajo.muestreo = futuro.result()
+            trabajo.tiempo_simulado = trabajo.stats.tiempo_final
+            trabajo.clientes_procesados = trabajo.stats.clientes_atendidos + trabajo.stats.clientes_abandonaron
+            trabajo.kpis = resumen_kpis(trabajo.stats, trabajo.duracion / 60.0)
+            estado = COMPLETADO
+        except Exception as error:
+            trabajo.error = f"{type(error).__name__}: {error}"
+            estado = FALLIDO
+        
+        with self._lock:
+            trabajo.estado = estado
+            self._buzones.pop(trabajo.id, None)
+        
+        if estado == COMPLETADO and self.al_completar:
+            try:
+                self.al_completar(trabajo)
+            except Exception as error:
+                trabajo.error_al_completar = f"{type(error).__name__}: {error}"
+        self._olvidar_antiguos()
+    
+    def _olvidar_antiguos(self):
+        """Conserva solo los `max_terminados` trabajos terminados más recientes"""
+        with self._lock:
+            terminados = sorted(
+                (t for t in self._trabajos.values() if t.terminado),
+                key=lambda t: t.creado
+            )
+            for trabajo in terminados[:max(len(terminados) - self.max_terminados, 0)]:
+                del self._trabajos[trabajo.id]
+    
+    def obtener(self, trabajo_id: str) -> Optional[Trabajo]:
+        """Trabajo con su avance actualizado (None si no existe o ya se olvidó)"""
+        with self._lock:
+            trabajo = self._trabajos.get(trabajo_id)
+            buzon = self._buzones.get(trabajo_id)
+            if trabajo is None or buzon is None or trabajo.terminado:
+                return trabajo
+            while True:
+                try:
+                    mensaje = buzon.get_nowait()
+                except queue.Empty:
+                    break
+                trabajo.estado = EJECUTANDO
+                trabajo.tiempo_simulado = mensaje['tiempo']
+                trabajo.clientes_procesados = mensaje['clientes']
+                trabajo.kpis = mensaje['kpis']
+                trabajo.puntos_cola.extend(mensaje['cola'])
+                trabajo.puntos_throughput.extend(mensaje['throughput'])
+        return trabajo
+    
+    def cerrar(self):
+        """Detiene el pool (espera a los trabajos en curso) y el Manager"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._manager.shutdown()
+            self._pool = None
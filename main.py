@@ -62,10 +62,17 @@ def ejecutar_analisis():
     """Ejecuta análisis comparativo completo"""
     print("\n📈 Ejecutando análisis comparativo de escenarios...")
     
+    from analisis.cache import CacheResultados
     from analisis.comparador import ComparadorEscenarios
     from analisis.reportes import GeneradorReportes
+    from analisis.repositorio import RepositorioCorridas
     
-    comparador = ComparadorEscenarios(duracion_simulacion=480.0)
+    # Semilla fija para que las réplicas repetidas salgan de la caché en disco;
+    # cada resultado queda además en el repositorio SQLite
+    comparador = ComparadorEscenarios(
+        duracion_simulacion=480.0, semilla=42, cache=CacheResultados(),
+        repositorio=RepositorioCorridas()
+    )
     
     # Ejecutar en demanda normal
     print("\n--- Demanda Normal ---")
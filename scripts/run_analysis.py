@@ -7,39 +7,44 @@ import sys
 # Añadir el directorio raíz al path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from analisis.cache import CacheResultados
 from analisis.comparador import ComparadorEscenarios
+from analisis.repositorio import RepositorioCorridas
 from analisis.reportes import GeneradorReportes
 from config import ESCENARIOS
 
 
+# Semilla base fija: las réplicas se repiten entre ejecuciones y salen de la caché
+SEMILLA_ANALISIS = 42
+
+
 def main():
     print("=" * 70)
     print("🛒 SUPERLATINO - ANÁLISIS COMPARATIVO DE CONFIGURACIONES")
     print("=" * 70)
     
-    comparador = ComparadorEscenarios(duracion_simulacion=480.0)
+    comparador = ComparadorEscenarios(
+        duracion_simulacion=480.0, motor="heap", muestreo="bloques",
+        semilla=SEMILLA_ANALISIS, cache=CacheResultados(), repositorio=RepositorioCorridas()
+    )
     
-    # Ejecutar todos los escenarios en demanda normal
-    print("\n📊 Simulando escenarios en DEMANDA NORMAL...\n")
-    for nombre, config in ESCENARIOS.items():
-        print(f"  ▶ Ejecutando: {nombre} ({config.descripcion()})...")
-        comparador.ejecutar_escenario(
-            nombre=f"{nombre}_normal",
-            config_cajas=config,
-            politica="balanceada",
-            alta_demanda=False
-        )
-    
-    # Ejecutar todos los escenarios en alta demanda
-    print("\n📊 Simulando escenarios en ALTA DEMANDA (fin de mes)...\n")
-    for nombre, config in ESCENARIOS.items():
-        print(f"  ▶ Ejecutando: {nombre} ({config.descripcion()})...")
-        comparador.ejecutar_escenario(
-            nombre=f"{nombre}_alta",
-            config_cajas=config,
-            politica="balanceada",
-            alta_demanda=True
+    # Ejecutar todos los escenarios en demanda normal y alta (fin de mes)
+    # como un solo barrido paralelo; las corridas de alta demanda van primero.
+    # Cada escenario replica hasta que el IC 95% de su espera promedio es ±0.2 min
+    print(f"\n📊 Simulando {len(ESCENARIOS)} escenarios en DEMANDA NORMAL y ALTA...\n")
+    comparador.ejecutar_barrido(
+        escenarios=ESCENARIOS,
+        politicas=["balanceada"],
+        demandas=[False, True],
+        repeticiones=5,
+        workers=os.cpu_count(),
+        formato_nombre="{escenario}_{demanda}",
+        semiancho_objetivo=0.2,
+        max_repeticiones=50,
+        al_completar=lambda nombre, r: print(
+            f"  ✔ Completado: {nombre} ({r['config_cajas'].descripcion()})"
         )
+    )
     
     # Mostrar tabla comparativa
     print("\n" + "=" * 70)
@@ -48,6 +53,12 @@ def main():
     tabla = comparador.obtener_tabla_comparativa()
     print(tabla.to_string(index=False))
     
+    # Diferencias pareadas (mismas semillas) contra el mejor escenario de cada demanda
+    for alta, etiqueta in ((False, "NORMAL"), (True, "ALTA")):
+        nombres = [n for n, r in comparador.resultados.items() if r['alta_demanda'] == alta]
+        print(f"\nDiferencia de espera promedio vs. el mejor escenario (demanda {etiqueta}, min):")
+        print(comparador.obtener_tabla_diferencias(nombres=nombres).to_string(index=False))
+    
     # Recomendaciones
     print("\n" + "=" * 70)
     print("📌 RECOMENDACIONES BASADAS EN ANÁLISIS")
@@ -63,6 +74,7 @@ def main():
     generador = GeneradorReportes(directorio_salida="reportes")
     generador.generar_reporte_completo(comparador, nombre_reporte="analisis_completo")
     
+    print(f"\n💾 Réplicas reutilizadas de la caché: {comparador.cache.aciertos}")
     print("\n✅ Análisis completado. Revise la carpeta 'reportes/' para ver los resultados.")
 
 
@@ -0,0 +1,115 @@
+"""
+Acumuladores de memoria constante: media/varianza (Welford) y cuantiles (boceto logarítmico)
+"""
+import math
+from typing import Dict, Optional
+
+
+class AcumuladorWelford:
+    """Conteo, media, varianza, mínimo y máximo en una pasada
+    
+    Usa la recurrencia de Welford, numéricamente estable, y se combina con
+    otro acumulador mediante la fórmula de Chan (útil para unir réplicas).
+    """
+    
+    __slots__ = ('n', 'media', '_m2', 'minimo', 'maximo')
+    
+    def __init__(self):
+        self.n: int = 0
+        self.media: float = 0.0
+        self._m2: float = 0.0
+        self.minimo: float = math.inf
+        self.maximo: float = -math.inf
+    
+    def agregar(self, valor: float):
+        """Incorpora una observación"""
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self._m2 += delta * (valor - self.media)
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+    
+    def combinar(self, otro: 'AcumuladorWelford'):
+        """Incorpora todas las observaciones de otro acumulador"""
+        if otro.n == 0:
+            return
+        n = self.n + otro.n
+        delta = otro.media - self.media
+        self.media += delta * otro.n / n
+        self._m2 += otro._m2 + delta * delta * self.n * otro.n / n
+        self.n = n
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+    
+    @property
+    def varianza(self) -> float:
+        """Varianza muestral (0 con menos de dos observaciones)"""
+        if self.n < 2:
+            return 0.0
+        return self._m2 / (self.n - 1)
+    
+    @property
+    def desviacion(self) -> float:
+        """Desviación estándar muestral"""
+        return math.sqrt(self.varianza)
+
+
+class BocetoCuantiles:
+    """Histograma con cubetas de ancho logarítmico para estimar cuantiles
+    
+    Cada cubeta i cubre (γ^(i-1), γ^i] con γ = (1+α)/(1-α), así que cualquier
+    cuantil se estima con error relativo ≤ α usando memoria proporcional al
+    rango dinámico de los datos, no a su cantidad. Los valores ≤ `minimo`
+    (p. ej. esperas nulas) van a una cubeta de ceros. Dos bocetos con la misma
+    precisión se combinan sumando cubetas.
+    """
+    
+    __slots__ = ('precision', 'minimo', '_gamma', '_log_gamma', 'ceros', 'n', 'cubetas')
+    
+    def __init__(self, precision: float = 0.01, minimo: float = 1e-6):
+        self.precision = precision
+        self.minimo = minimo
+        self._gamma = (1 + precision) / (1 - precision)
+        self._log_gamma = math.log(self._gamma)
+        self.ceros: int = 0
+        self.n: int = 0
+        self.cubetas: Dict[int, int] = {}
+    
+    def agregar(self, valor: float):
+        """Incorpora una observación no negativa"""
+        self.n += 1
+        if valor <= self.minimo:
+            self.ceros += 1
+            return
+        i = math.ceil(math.log(valor) / self._log_gamma)
+        self.cubetas[i] = self.cubetas.get(i, 0) + 1
+    
+    def combinar(self, otro: 'BocetoCuantiles'):
+        """Incorpora las cubetas de otro boceto con la misma precisión"""
+        if otro.precision != self.precision:
+            raise ValueError("Solo se combinan bocetos con la misma precisión")
+        self.n += otro.n
+        self.ceros += otro.ceros
+        for i, cuenta in otro.cubetas.items():
+            self.cubetas[i] = self.cubetas.get(i, 0) + cuenta
+    
+    def _valor_cubeta(self, i: int) -> float:
+        """Representante de la cubeta i (error relativo ≤ α en todo su rango)"""
+        return 2 * self._gamma ** i / (self._gamma + 1)
+    
+    def cuantil(self, q: float) -> Optional[float]:
+        """Cuantil q ∈ [0, 1] (None si el boceto está vacío)"""
+        if self.n == 0:
+            return None
+        rango = q * (self.n - 1)
+        if rango < self.ceros:
+            return 0.0
+        acumulado = self.ceros
+        for i in sorted(self.cubetas):
+            acumulado += self.cubetas[i]
+            if acumulado > rango:
+                return self._valor_cubeta(i)
+        return self._valor_cubeta(max(self.cubetas))
@@ -6,9 +6,12 @@ import random
 from dataclasses import dataclass, field
 from typing import List, Optional, TYPE_CHECKING
 from config import TipoCaja, ConfiguracionSimulacion
+from .colas import ColaClientes
+from .estadisticas import SerieEscalonada, EntradasObservadas
 
 if TYPE_CHECKING:
     from .cliente import Cliente
+    from .fuente import FuenteServicio
 
 
 @dataclass
@@ -41,22 +44,36 @@ class Caja:
         self.config = config
         
         # Recurso SimPy (1 servidor por caja)
-        self.recurso = simpy.Resource(env, capacity=1)
+        self.recurso = self._crear_recurso()
         
-        # Cola de espera visual (para Pygame)
-        self.cola_visual: List['Cliente'] = []
+        # Cola de espera visual (para Pygame), en orden de llegada
+        self.cola_visual = ColaClientes()
         
         # Cliente siendo atendido actualmente
         self.cliente_actual: Optional['Cliente'] = None
         
+        # Flujo aleatorio propio del servicio (por defecto el módulo random)
+        self.rng: random.Random = random
+        
+        # Ruido de servicio precalculado por bloques (None = usar self.rng)
+        self.fuente_servicio: Optional['FuenteServicio'] = None
+        
+        # Registro de los sorteos de servicio (variables de control)
+        self.entradas: Optional[EntradasObservadas] = None
+        
         # Estadísticas
         self.stats = EstadisticasCaja()
         self._ultimo_tiempo_libre: float = 0.0
+        self.serie_ocupada = SerieEscalonada(guardar_cambios=False)  # 1 mientras atiende
         
         # Posición para visualización
         self.pos_x: float = 0.0
         self.pos_y: float = 0.0
     
+    def _crear_recurso(self) -> Optional[simpy.Resource]:
+        """Crea el recurso SimPy que modela al cajero"""
+        return simpy.Resource(self.env, capacity=1)
+    
     @property
     def tiempo_servicio_base(self) -> float:
         """Tiempo base de servicio según tipo de caja"""
@@ -69,15 +86,25 @@ class Caja:
     
     def calcular_tiempo_servicio(self, cliente: 'Cliente') -> float:
         """Calcula tiempo de servicio para un cliente específico"""
+        fuente = self.fuente_servicio
+        
         # Tiempo base exponencial
-        tiempo_base = random.expovariate(1.0 / self.tiempo_servicio_base)
+        if fuente is not None:
+            tiempo_base = fuente.exponencial(self.tiempo_servicio_base)
+        else:
+            tiempo_base = self.rng.expovariate(1.0 / self.tiempo_servicio_base)
+        if self.entradas is not None:
+            self.entradas.registrar_servicio(tiempo_base / self.tiempo_servicio_base)
         
         # Ajuste por cantidad de productos
         tiempo_productos = cliente.num_productos * self.config.tiempo_por_producto
         
         # Las cajas automáticas son más lentas para clientes inexpertos
         if self.tipo == TipoCaja.AUTOMATICA:
-            factor_inexperiencia = random.uniform(1.0, 1.5)
+            if fuente is not None:
+                factor_inexperiencia = fuente.factor_inexperiencia()
+            else:
+                factor_inexperiencia = self.rng.uniform(1.0, 1.5)
             tiempo_base *= factor_inexperiencia
         
         return tiempo_base + tiempo_productos
@@ -100,12 +127,18 @@ class Caja:
         """Registra inicio de atención"""
         tiempo_ocioso = self.env.now - self._ultimo_tiempo_libre
         self.stats.tiempo_ocioso += max(0, tiempo_ocioso)
+        self.serie_ocupada.cambiar(self.env.now, 1)
     
     def registrar_fin_servicio(self, tiempo_servicio: float):
         """Registra fin de atención"""
         self.stats.clientes_atendidos += 1
         self.stats.tiempo_ocupado += tiempo_servicio
         self._ultimo_tiempo_libre = self.env.now
+        self.serie_ocupada.cambiar(self.env.now, -1)
+    
+    def ocupacion(self, hasta: float) -> float:
+        """Porcentaje del tiempo ocupada hasta `hasta`, incluido el servicio en curso"""
+        return self.serie_ocupada.promedio(hasta) * 100
     
     def __repr__(self):
         return f"Caja({self.id}, tipo={self.tipo.value}, cola={self.longitud_cola()})"
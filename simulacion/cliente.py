@@ -30,17 +30,23 @@ class Cliente:
     sprite_index: int = 0
     
     @classmethod
-    def generar(cls, id: int, tiempo_llegada: float, config: ConfiguracionSimulacion) -> 'Cliente':
-        """Genera un cliente con productos y tolerancia aleatorios"""
-        num_productos = random.randint(
+    def generar(
+        cls,
+        id: int,
+        tiempo_llegada: float,
+        config: ConfiguracionSimulacion,
+        rng: random.Random = random
+    ) -> 'Cliente':
+        """Genera un cliente con productos y tolerancia aleatorios (del flujo `rng`)"""
+        num_productos = rng.randint(
             config.productos_cliente_min,
             config.productos_cliente_max
         )
-        tolerancia = random.uniform(
+        tolerancia = rng.uniform(
             config.tiempo_abandono_min,
             config.tiempo_abandono_max
         )
-        sprite = random.randint(1, 3)  # 3 sprites disponibles
+        sprite = rng.randint(1, 3)  # 3 sprites disponibles
         
         return cls(
             id=id,
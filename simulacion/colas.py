@@ -0,0 +1,67 @@
+"""
+Contenedor FIFO de clientes con pertenencia y borrado en O(1)
+"""
+from collections import OrderedDict
+from itertools import islice
+from typing import Iterator, List, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .cliente import Cliente
+
+
+class ColaClientes:
+    """Clientes en orden de llegada, indexados por id
+    
+    Ofrece la parte de la interfaz de `list` que usa la simulación
+    (append, remove, in, len, iteración y slicing) más `popleft`, pero con
+    pertenencia y borrado en O(1) en lugar de O(n).
+    """
+    
+    __slots__ = ('_clientes',)
+    
+    def __init__(self):
+        self._clientes: 'OrderedDict[int, Cliente]' = OrderedDict()
+    
+    def append(self, cliente: 'Cliente'):
+        """Añade un cliente al final"""
+        self._clientes[cliente.id] = cliente
+    
+    def remove(self, cliente: 'Cliente'):
+        """Quita un cliente (ValueError si no está, como list.remove)"""
+        try:
+            del self._clientes[cliente.id]
+        except KeyError:
+            raise ValueError(f"{cliente!r} no está en la cola") from None
+    
+    def popleft(self) -> 'Cliente':
+        """Quita y devuelve el primer cliente"""
+        return self._clientes.popitem(last=False)[1]
+    
+    def pop(self) -> 'Cliente':
+        """Quita y devuelve el último cliente"""
+        return self._clientes.popitem(last=True)[1]
+    
+    def __contains__(self, cliente: 'Cliente') -> bool:
+        return cliente.id in self._clientes
+    
+    def __len__(self) -> int:
+        return len(self._clientes)
+    
+    def __iter__(self) -> Iterator['Cliente']:
+        return iter(self._clientes.values())
+    
+    def __getitem__(self, indice: Union[int, slice]) -> Union['Cliente', List['Cliente']]:
+        """Acceso por posición; los slices solo recorren hasta su final"""
+        if isinstance(indice, slice):
+            inicio, fin, paso = indice.indices(len(self))
+            if paso < 0:
+                return list(self)[indice]
+            return list(islice(self, inicio, fin, paso))
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice fuera de la cola")
+        return next(islice(self, indice, None))
+    
+    def __repr__(self):
+        return f"ColaClientes({list(self)!r})"
@@ -1,13 +1,105 @@
 """
 Sistema de recolección de estadísticas de la simulación
 """
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
-from config import TipoCaja, ConfiguracionCajas, CostosOperacionales
+from typing import List, Dict, Optional, Tuple
+from config import TipoCaja, ConfiguracionSimulacion, ConfiguracionCajas, CostosOperacionales
+from .acumuladores import AcumuladorWelford, BocetoCuantiles
 import pandas as pd
 import numpy as np
 
 
+class SerieEscalonada:
+    """Variable de estado constante a tramos (cola, clientes en sistema, caja ocupada)
+    
+    Se actualiza solo cuando cambia: acumula su integral ponderada por tiempo
+    y guarda los puntos de cambio para muestrearla después a cualquier resolución.
+    Con `resolucion` solo guarda el valor vigente en cada múltiplo de ella
+    (memoria proporcional al horizonte, no al número de cambios).
+    """
+    
+    def __init__(self, guardar_cambios: bool = True, resolucion: Optional[float] = None):
+        self.valor: float = 0.0
+        self.maximo: float = 0.0
+        self.ultimo_tiempo: float = 0.0
+        self.area: float = 0.0
+        self.guardar_cambios = guardar_cambios
+        self.resolucion = resolucion
+        self._proximo_corte = resolucion
+        self._tiempos = array('d', [0.0])
+        self._valores = array('d', [0.0])
+    
+    def cambiar(self, tiempo: float, delta: float):
+        """Suma `delta` al valor a partir del instante `tiempo`"""
+        if self.resolucion is not None:
+            # Fijar el valor vigente en los cortes anteriores a este cambio
+            while self._proximo_corte < tiempo:
+                self._tiempos.append(self._proximo_corte)
+                self._valores.append(self.valor)
+                self._proximo_corte += self.resolucion
+        
+        self.area += self.valor * (tiempo - self.ultimo_tiempo)
+        self.ultimo_tiempo = tiempo
+        self.valor += delta
+        if self.valor > self.maximo:
+            self.maximo = self.valor
+        
+        if self.guardar_cambios and self.resolucion is None:
+            if self._tiempos[-1] == tiempo:
+                self._valores[-1] = self.valor
+            else:
+                self._tiempos.append(tiempo)
+                self._valores.append(self.valor)
+    
+    def integral(self, hasta: float) -> float:
+        """Integral del valor entre 0 y `hasta` (no anterior al último cambio)"""
+        return self.area + self.valor * (hasta - self.ultimo_tiempo)
+    
+    def promedio(self, hasta: float) -> float:
+        """Promedio ponderado por tiempo entre 0 y `hasta`"""
+        if hasta <= 0:
+            return 0.0
+        return self.integral(hasta) / hasta
+    
+    def _puntos(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Instantes de cambio y valor vigente desde cada uno"""
+        cambios = np.array(self._tiempos)
+        valores = np.array(self._valores)
+        if cambios[-1] < self.ultimo_tiempo:
+            # Con resolución el último cambio no está entre los cortes guardados
+            cambios = np.append(cambios, self.ultimo_tiempo)
+            valores = np.append(valores, self.valor)
+        return cambios, valores
+    
+    def valores_en(self, tiempos: np.ndarray) -> np.ndarray:
+        """Valor vigente en cada instante pedido"""
+        cambios, valores = self._puntos()
+        indices = np.searchsorted(cambios, tiempos, side='right') - 1
+        return valores[np.maximum(indices, 0)]
+    
+    def promedios_por_intervalo(self, paso: float, hasta: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Promedio ponderado por tiempo en cada intervalo [k·paso, (k+1)·paso) antes de `hasta`
+        
+        Es exacto con todos los cambios guardados; con `resolucion` trata cada
+        corte como un escalón (aproximación al paso de la resolución).
+        """
+        cambios, valores = self._puntos()
+        # Integral acumulada en cada punto de cambio: F(x) = F(t_j) + v_j·(x − t_j)
+        area_en_cambios = np.concatenate(([0.0], np.cumsum(valores[:-1] * np.diff(cambios))))
+        bordes = np.arange(0.0, hasta + paso / 2, paso)
+        if bordes.size < 2:
+            return np.empty(0), np.empty(0)
+        j = np.maximum(np.searchsorted(cambios, bordes, side='right') - 1, 0)
+        integral = area_en_cambios[j] + valores[j] * (bordes - cambios[j])
+        return bordes[1:], np.diff(integral) / paso
+    
+    def muestrear(self, paso: float, desde: float, hasta: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Muestras en desde+paso, desde+2·paso, ... estrictamente antes de `hasta`"""
+        tiempos = np.arange(desde + paso, hasta, paso)
+        return tiempos, self.valores_en(tiempos)
+
+
 @dataclass
 class RegistroCliente:
     """Registro de un cliente para análisis"""
@@ -24,25 +116,174 @@ class RegistroCliente:
     tiempo_total: float
 
 
+# Códigos categóricos de tipo_caja (-1 = sin caja)
+TIPOS_CAJA: List[TipoCaja] = list(TipoCaja)
+_CODIGO_TIPO: Dict[TipoCaja, int] = {tipo: i for i, tipo in enumerate(TIPOS_CAJA)}
+
+# Una fila por cliente; los tiempos ausentes se guardan como NaN y caja_id ausente como -1
+DTYPE_REGISTRO = np.dtype([
+    ('id', np.int64),
+    ('tiempo_llegada', np.float64),
+    ('tiempo_inicio_servicio', np.float64),
+    ('tiempo_fin_servicio', np.float64),
+    ('num_productos', np.int32),
+    ('tipo_caja', np.int8),
+    ('caja_id', np.int32),
+    ('abandono', np.bool_),
+    ('tiempo_espera', np.float64),
+    ('tiempo_servicio', np.float64),
+    ('tiempo_total', np.float64),
+])
+
+CAPACIDAD_INICIAL = 1024
+
+# Percentiles de espera reportados (p. ej. SLA "95% espera menos de 5 min")
+PERCENTILES_ESPERA = (50, 90, 95, 99)
+
+
+class TablaClientes:
+    """Registros de clientes en un arreglo NumPy estructurado que crece al doble
+    
+    Cada cliente ocupa DTYPE_REGISTRO.itemsize bytes (66) en lugar de un
+    objeto RegistroCliente con sus floats en caja. Las columnas se exponen
+    como vistas sin copia.
+    
+    Con el margen de crecimiento y las series escalonadas, una corrida baja
+    de ~390 a ~150-190 bytes por cliente (unas 2-2.5 veces menos, no un orden
+    de magnitud). Para horizontes largos, EstadisticasStreaming no guarda
+    filas y queda en ~35-50 bytes por cliente.
+    """
+    
+    __slots__ = ('_datos', '_n')
+    
+    def __init__(self, capacidad: int = CAPACIDAD_INICIAL):
+        self._datos = np.empty(capacidad, dtype=DTYPE_REGISTRO)
+        self._n = 0
+    
+    def __len__(self) -> int:
+        return self._n
+    
+    def agregar(self, fila: tuple):
+        """Añade una fila con los campos en el orden de DTYPE_REGISTRO"""
+        n = self._n
+        if n == len(self._datos):
+            datos = np.empty(2 * n, dtype=DTYPE_REGISTRO)
+            datos[:n] = self._datos
+            self._datos = datos
+        self._datos[n] = fila
+        self._n = n + 1
+    
+    def columna(self, nombre: str) -> np.ndarray:
+        """Vista de una columna con las filas registradas"""
+        return self._datos[nombre][:self._n]
+    
+    def registro(self, i: int) -> RegistroCliente:
+        """Fila `i` como RegistroCliente (None en los campos ausentes)"""
+        fila = self._datos[i]
+        
+        def opcional(valor: float) -> Optional[float]:
+            return None if np.isnan(valor) else float(valor)
+        
+        codigo = int(fila['tipo_caja'])
+        caja_id = int(fila['caja_id'])
+        return RegistroCliente(
+            id=int(fila['id']),
+            tiempo_llegada=float(fila['tiempo_llegada']),
+            tiempo_inicio_servicio=opcional(fila['tiempo_inicio_servicio']),
+            tiempo_fin_servicio=opcional(fila['tiempo_fin_servicio']),
+            num_productos=int(fila['num_productos']),
+            tipo_caja=TIPOS_CAJA[codigo].value if codigo >= 0 else None,
+            caja_id=caja_id if caja_id >= 0 else None,
+            abandono=bool(fila['abandono']),
+            tiempo_espera=float(fila['tiempo_espera']),
+            tiempo_servicio=float(fila['tiempo_servicio']),
+            tiempo_total=float(fila['tiempo_total'])
+        )
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes ocupados por las filas registradas"""
+        return self._n * DTYPE_REGISTRO.itemsize
+
+
+# Variables de control: entradas aleatorias cuya media teórica se conoce
+CONTROLES = ('intervalo', 'servicio_relativo', 'tolerancia', 'productos')
+
+
+@dataclass
+class EntradasObservadas:
+    """Sumas de las entradas aleatorias sorteadas en una corrida
+    
+    Sus medias teóricas salen de ConfiguracionSimulacion, así que los desvíos
+    observados sirven como variables de control para ajustar los KPIs.
+    """
+    suma_intervalos: float = 0.0
+    n_intervalos: int = 0
+    suma_servicio_relativo: float = 0.0  # Exponencial base / media de su tipo
+    n_servicios: int = 0
+    suma_tolerancias: float = 0.0
+    suma_productos: int = 0
+    n_clientes: int = 0
+    
+    def registrar_intervalo(self, intervalo: float):
+        """Registra un tiempo entre llegadas"""
+        self.suma_intervalos += intervalo
+        self.n_intervalos += 1
+    
+    def registrar_servicio(self, relativo: float):
+        """Registra un tiempo base de servicio relativo a la media de su caja"""
+        self.suma_servicio_relativo += relativo
+        self.n_servicios += 1
+    
+    def registrar_cliente(self, cliente):
+        """Registra la tolerancia y los productos de un cliente nuevo"""
+        self.suma_tolerancias += cliente.tolerancia_espera
+        self.suma_productos += cliente.num_productos
+        self.n_clientes += 1
+    
+    def desvios(self, config: ConfiguracionSimulacion, tasa_llegada: float) -> Dict[str, float]:
+        """Media observada menos media teórica de cada control (0 si no hubo sorteos)"""
+        def desvio(suma: float, n: int, esperada: float) -> float:
+            return suma / n - esperada if n else 0.0
+        
+        return {
+            'intervalo': desvio(self.suma_intervalos, self.n_intervalos, 1.0 / tasa_llegada),
+            'servicio_relativo': desvio(self.suma_servicio_relativo, self.n_servicios, 1.0),
+            'tolerancia': desvio(
+                self.suma_tolerancias, self.n_clientes,
+                (config.tiempo_abandono_min + config.tiempo_abandono_max) / 2
+            ),
+            'productos': desvio(
+                self.suma_productos, self.n_clientes,
+                (config.productos_cliente_min + config.productos_cliente_max) / 2
+            ),
+        }
+
+
 @dataclass
 class EstadisticasSimulacion:
     """Recolector de estadísticas de la simulación"""
     
-    registros: List[RegistroCliente] = field(default_factory=list)
+    tabla: TablaClientes = field(default_factory=TablaClientes)
+    
+    # Histograma logarítmico de esperas de atendidos (combinable entre réplicas)
+    boceto_espera: BocetoCuantiles = field(default_factory=BocetoCuantiles)
     
     # Contadores en tiempo real
     clientes_totales: int = 0
     clientes_atendidos: int = 0
     clientes_abandonaron: int = 0
     
-    # Métricas agregadas
-    _tiempos_espera: List[float] = field(default_factory=list)
-    _tiempos_servicio: List[float] = field(default_factory=list)
-    _tiempos_sistema: List[float] = field(default_factory=list)
+    # Estado ponderado por tiempo, actualizado solo en cada cambio
+    serie_cola: SerieEscalonada = field(default_factory=SerieEscalonada)  # Clientes en colas
+    serie_sistema: SerieEscalonada = field(default_factory=SerieEscalonada)  # Clientes en el sistema
+    serie_atendidos: SerieEscalonada = field(default_factory=SerieEscalonada)  # Atendidos acumulados
     
-    # Histórico para gráficas en tiempo real
-    historico_cola: List[tuple] = field(default_factory=list)  # (tiempo, longitud)
-    historico_throughput: List[tuple] = field(default_factory=list)  # (tiempo, clientes/hora)
+    # Instante hasta el que llega la simulación (horizonte de las series)
+    tiempo_final: float = 0.0
+    
+    # Medias de las entradas aleatorias (variables de control)
+    entradas: EntradasObservadas = field(default_factory=EntradasObservadas)
     
     def registrar_cliente(
         self,
@@ -51,6 +292,35 @@ class EstadisticasSimulacion:
         caja_id: Optional[int] = None
     ):
         """Registra un cliente completado o que abandonó"""
+        tiempo_espera, tiempo_servicio, tiempo_total = self._tiempos_cliente(cliente)
+        
+        inicio = cliente.tiempo_inicio_servicio
+        fin = cliente.tiempo_fin_servicio
+        self.tabla.agregar((
+            cliente.id,
+            cliente.tiempo_llegada,
+            np.nan if inicio is None else inicio,
+            np.nan if fin is None else fin,
+            cliente.num_productos,
+            _CODIGO_TIPO[tipo_caja] if tipo_caja else -1,
+            -1 if caja_id is None else caja_id,
+            cliente.abandono,
+            tiempo_espera,
+            tiempo_servicio,
+            tiempo_total
+        ))
+        self.clientes_totales += 1
+        
+        if cliente.abandono:
+            self.clientes_abandonaron += 1
+        else:
+            self.clientes_atendidos += 1
+            self.boceto_espera.agregar(tiempo_espera)
+            self.serie_atendidos.cambiar(fin, 1)
+    
+    @staticmethod
+    def _tiempos_cliente(cliente) -> Tuple[float, float, float]:
+        """Tiempos de espera, servicio y total en el sistema de un cliente"""
         tiempo_espera = 0.0
         tiempo_servicio = 0.0
         tiempo_total = 0.0
@@ -66,68 +336,141 @@ class EstadisticasSimulacion:
         if cliente.tiempo_fin_servicio:
             tiempo_total = cliente.tiempo_fin_servicio - cliente.tiempo_llegada
         
-        registro = RegistroCliente(
-            id=cliente.id,
-            tiempo_llegada=cliente.tiempo_llegada,
-            tiempo_inicio_servicio=cliente.tiempo_inicio_servicio,
-            tiempo_fin_servicio=cliente.tiempo_fin_servicio,
-            num_productos=cliente.num_productos,
-            tipo_caja=tipo_caja.value if tipo_caja else None,
-            caja_id=caja_id,
-            abandono=cliente.abandono,
-            tiempo_espera=tiempo_espera,
-            tiempo_servicio=tiempo_servicio,
-            tiempo_total=tiempo_total
-        )
-        
-        self.registros.append(registro)
-        self.clientes_totales += 1
-        
-        if cliente.abandono:
-            self.clientes_abandonaron += 1
-        else:
-            self.clientes_atendidos += 1
-            self._tiempos_espera.append(tiempo_espera)
-            self._tiempos_servicio.append(tiempo_servicio)
-            self._tiempos_sistema.append(tiempo_total)
+        return tiempo_espera, tiempo_servicio, tiempo_total
     
-    def registrar_estado_cola(self, tiempo: float, longitud_total: int):
-        """Registra estado de colas para gráficas"""
-        self.historico_cola.append((tiempo, longitud_total))
+    @property
+    def registros(self) -> List[RegistroCliente]:
+        """Registros como objetos (se construyen bajo demanda)"""
+        return [self.tabla.registro(i) for i in range(len(self.tabla))]
+    
+    def _de_atendidos(self, nombre: str) -> np.ndarray:
+        """Columna filtrada a los clientes atendidos"""
+        return self.tabla.columna(nombre)[~self.tabla.columna('abandono')]
     
-    def registrar_throughput(self, tiempo: float, clientes_hora: float):
-        """Registra throughput para gráficas"""
-        self.historico_throughput.append((tiempo, clientes_hora))
+    @property
+    def _tiempos_espera(self) -> np.ndarray:
+        """Tiempos de espera de los clientes atendidos"""
+        return self._de_atendidos('tiempo_espera')
+    
+    @property
+    def _tiempos_servicio(self) -> np.ndarray:
+        """Tiempos de servicio de los clientes atendidos"""
+        return self._de_atendidos('tiempo_servicio')
+    
+    @property
+    def _tiempos_sistema(self) -> np.ndarray:
+        """Tiempos en el sistema de los clientes atendidos"""
+        return self._de_atendidos('tiempo_total')
+    
+    def registrar_cambio_cola(self, tiempo: float, delta: int):
+        """Registra que el total de clientes en cola cambió en `delta`"""
+        self.serie_cola.cambiar(tiempo, delta)
+    
+    def registrar_cambio_sistema(self, tiempo: float, delta: int):
+        """Registra que los clientes en el sistema cambiaron en `delta`"""
+        self.serie_sistema.cambiar(tiempo, delta)
+    
+    # ==================== SERIES DE TIEMPO ====================
+    
+    def muestrear_cola(
+        self,
+        paso: float = 1.0,
+        desde: float = 0.0,
+        hasta: Optional[float] = None
+    ) -> List[tuple]:
+        """Longitud total de cola muestreada cada `paso` minutos: [(tiempo, longitud)]"""
+        if hasta is None:
+            hasta = self.tiempo_final
+        tiempos, valores = self.serie_cola.muestrear(paso, desde, hasta)
+        return list(zip(tiempos.tolist(), valores.tolist()))
+    
+    def muestrear_throughput(
+        self,
+        paso: float = 1.0,
+        desde: float = 0.0,
+        hasta: Optional[float] = None
+    ) -> List[tuple]:
+        """Throughput acumulado cada `paso` minutos: [(tiempo, clientes/hora)]"""
+        if hasta is None:
+            hasta = self.tiempo_final
+        tiempos, atendidos = self.serie_atendidos.muestrear(paso, desde, hasta)
+        throughput = atendidos / (tiempos / 60.0)
+        return list(zip(tiempos.tolist(), throughput.tolist()))
+    
+    def series_columnares(self, paso: float = 1.0) -> Dict[str, np.ndarray]:
+        """Cola, clientes en sistema y throughput cada `paso` minutos, como columnas NumPy"""
+        tiempos, cola = self.serie_cola.muestrear(paso, 0.0, self.tiempo_final)
+        atendidos = self.serie_atendidos.valores_en(tiempos)
+        return {
+            'tiempo': tiempos,
+            'longitud_cola': cola,
+            'clientes_sistema': self.serie_sistema.valores_en(tiempos),
+            'throughput': atendidos / (tiempos / 60.0),
+        }
+    
+    @property
+    def historico_cola(self) -> List[tuple]:
+        """Longitud de cola por minuto (tiempo, longitud)"""
+        return self.muestrear_cola()
+    
+    @property
+    def historico_throughput(self) -> List[tuple]:
+        """Throughput por minuto (tiempo, clientes/hora)"""
+        return self.muestrear_throughput()
     
     # ==================== KPIs ====================
     
     @property
     def tiempo_espera_promedio(self) -> float:
         """Tiempo promedio de espera en cola (minutos)"""
-        if not self._tiempos_espera:
+        tiempos = self._tiempos_espera
+        if not tiempos.size:
             return 0.0
-        return np.mean(self._tiempos_espera)
+        return np.mean(tiempos)
     
     @property
     def tiempo_espera_maximo(self) -> float:
         """Tiempo máximo de espera"""
-        if not self._tiempos_espera:
+        tiempos = self._tiempos_espera
+        if not tiempos.size:
             return 0.0
-        return np.max(self._tiempos_espera)
+        return np.max(tiempos)
     
     @property
     def tiempo_servicio_promedio(self) -> float:
         """Tiempo promedio de servicio"""
-        if not self._tiempos_servicio:
+        tiempos = self._tiempos_servicio
+        if not tiempos.size:
             return 0.0
-        return np.mean(self._tiempos_servicio)
+        return np.mean(tiempos)
     
     @property
     def tiempo_sistema_promedio(self) -> float:
         """Tiempo promedio total en el sistema"""
-        if not self._tiempos_sistema:
+        tiempos = self._tiempos_sistema
+        if not tiempos.size:
             return 0.0
-        return np.mean(self._tiempos_sistema)
+        return np.mean(tiempos)
+    
+    def percentil_espera(self, p: float) -> float:
+        """Percentil p (0–100) del tiempo de espera de los atendidos"""
+        valor = self.boceto_espera.cuantil(p / 100)
+        return 0.0 if valor is None else valor
+    
+    @property
+    def percentiles_espera(self) -> Dict[int, float]:
+        """Percentiles de espera reportados: {50: ..., 90: ..., 95: ..., 99: ...}"""
+        return {p: self.percentil_espera(p) for p in PERCENTILES_ESPERA}
+    
+    @property
+    def longitud_cola_promedio(self) -> float:
+        """Clientes en cola, promedio ponderado por tiempo"""
+        return self.serie_cola.promedio(self.tiempo_final)
+    
+    @property
+    def clientes_sistema_promedio(self) -> float:
+        """Clientes en el sistema, promedio ponderado por tiempo"""
+        return self.serie_sistema.promedio(self.tiempo_final)
     
     @property
     def tasa_abandono(self) -> float:
@@ -143,25 +486,53 @@ class EstadisticasSimulacion:
         return self.clientes_atendidos / duracion_horas
     
     def to_dataframe(self) -> pd.DataFrame:
-        """Convierte registros a DataFrame para análisis"""
-        if not self.registros:
+        """Convierte registros a DataFrame para análisis
+        
+        Las columnas numéricas envuelven las del registro sin copiarlas;
+        tipo_caja es categórica y caja_id usa -1 para clientes sin caja.
+        """
+        if not len(self.tabla):
             return pd.DataFrame()
         
-        data = [
-            {
-                'id': r.id,
-                'tiempo_llegada': r.tiempo_llegada,
-                'tiempo_espera': r.tiempo_espera,
-                'tiempo_servicio': r.tiempo_servicio,
-                'tiempo_total': r.tiempo_total,
-                'num_productos': r.num_productos,
-                'tipo_caja': r.tipo_caja,
-                'caja_id': r.caja_id,
-                'abandono': r.abandono
-            }
-            for r in self.registros
-        ]
-        return pd.DataFrame(data)
+        columna = self.tabla.columna
+        tipo_caja = pd.Categorical.from_codes(
+            columna('tipo_caja'), categories=[t.value for t in TIPOS_CAJA]
+        )
+        return pd.DataFrame({
+            'id': columna('id'),
+            'tiempo_llegada': columna('tiempo_llegada'),
+            'tiempo_espera': columna('tiempo_espera'),
+            'tiempo_servicio': columna('tiempo_servicio'),
+            'tiempo_total': columna('tiempo_total'),
+            'num_productos': columna('num_productos'),
+            'tipo_caja': tipo_caja,
+            'caja_id': columna('caja_id'),
+            'abandono': columna('abandono')
+        }, copy=False)
+    
+    def por_tipo_caja(self) -> Dict[str, np.ndarray]:
+        """Atendidos, espera y servicio promedio por tipo de caja (solo tipos con clientes)
+        
+        Agrega las columnas del registro con np.bincount sobre los códigos de
+        tipo_caja, sin construir el DataFrame.
+        """
+        atendidos = ~self.tabla.columna('abandono')
+        codigos = self.tabla.columna('tipo_caja')[atendidos].astype(np.intp)
+        con_caja = codigos >= 0
+        codigos = codigos[con_caja]
+        
+        num_tipos = len(TIPOS_CAJA)
+        clientes = np.bincount(codigos, minlength=num_tipos)
+        espera = np.bincount(codigos, self._de_atendidos('tiempo_espera')[con_caja], num_tipos)
+        servicio = np.bincount(codigos, self._de_atendidos('tiempo_servicio')[con_caja], num_tipos)
+        
+        presentes = clientes > 0
+        return {
+            'tipo_caja': np.array([t.value for t in TIPOS_CAJA])[presentes],
+            'clientes': clientes[presentes],
+            'espera_promedio': espera[presentes] / clientes[presentes],
+            'servicio_promedio': servicio[presentes] / clientes[presentes],
+        }
     
     def resumen(self) -> Dict:
         """Genera resumen de estadísticas"""
@@ -172,8 +543,13 @@ class EstadisticasSimulacion:
             'tasa_abandono': f"{self.tasa_abandono:.1f}%",
             'tiempo_espera_promedio': f"{self.tiempo_espera_promedio:.2f} min",
             'tiempo_espera_maximo': f"{self.tiempo_espera_maximo:.2f} min",
+            **{
+                f'tiempo_espera_p{p}': f"{valor:.2f} min"
+                for p, valor in self.percentiles_espera.items()
+            },
             'tiempo_servicio_promedio': f"{self.tiempo_servicio_promedio:.2f} min",
             'tiempo_sistema_promedio': f"{self.tiempo_sistema_promedio:.2f} min",
+            'longitud_cola_promedio': f"{self.longitud_cola_promedio:.2f} clientes",
         }
     
     def calcular_costo_beneficio(
@@ -205,3 +581,73 @@ class EstadisticasSimulacion:
             'costo_total_real': costo_total + perdida_abandonos,
             'eficiencia': throughput_hora / max(1, costo_hora)
         }
+
+
+def _serie_por_minuto() -> SerieEscalonada:
+    return SerieEscalonada(resolucion=1.0)
+
+
+@dataclass
+class EstadisticasStreaming(EstadisticasSimulacion):
+    """Estadísticas de memoria acotada para horizontes largos
+    
+    No guarda registros por cliente: los tiempos de los clientes atendidos se
+    resumen en acumuladores de Welford (media, varianza, máximo) y bocetos de
+    cuantiles combinables, y las series guardan un punto por minuto. Los KPIs,
+    resumen() y calcular_costo_beneficio() funcionan igual; to_dataframe() y
+    _tiempos_* quedan vacíos.
+    """
+    
+    serie_cola: SerieEscalonada = field(default_factory=_serie_por_minuto)
+    serie_sistema: SerieEscalonada = field(default_factory=_serie_por_minuto)
+    serie_atendidos: SerieEscalonada = field(default_factory=_serie_por_minuto)
+    
+    espera: AcumuladorWelford = field(default_factory=AcumuladorWelford)
+    servicio: AcumuladorWelford = field(default_factory=AcumuladorWelford)
+    sistema: AcumuladorWelford = field(default_factory=AcumuladorWelford)
+    
+    boceto_servicio: BocetoCuantiles = field(default_factory=BocetoCuantiles)
+    boceto_sistema: BocetoCuantiles = field(default_factory=BocetoCuantiles)
+    
+    def registrar_cliente(
+        self,
+        cliente,
+        tipo_caja: Optional[TipoCaja] = None,
+        caja_id: Optional[int] = None
+    ):
+        """Actualiza contadores y acumuladores sin guardar el registro"""
+        self.clientes_totales += 1
+        
+        if cliente.abandono:
+            self.clientes_abandonaron += 1
+            return
+        
+        tiempo_espera, tiempo_servicio, tiempo_total = self._tiempos_cliente(cliente)
+        self.clientes_atendidos += 1
+        self.espera.agregar(tiempo_espera)
+        self.servicio.agregar(tiempo_servicio)
+        self.sistema.agregar(tiempo_total)
+        self.boceto_espera.agregar(tiempo_espera)
+        self.boceto_servicio.agregar(tiempo_servicio)
+        self.boceto_sistema.agregar(tiempo_total)
+        self.serie_atendidos.cambiar(cliente.tiempo_fin_servicio, 1)
+    
+    @property
+    def tiempo_espera_promedio(self) -> float:
+        """Tiempo promedio de espera en cola (minutos)"""
+        return self.espera.media
+    
+    @property
+    def tiempo_espera_maximo(self) -> float:
+        """Tiempo máximo de espera"""
+        return self.espera.maximo if self.espera.n else 0.0
+    
+    @property
+    def tiempo_servicio_promedio(self) -> float:
+        """Tiempo promedio de servicio"""
+        return self.servicio.media
+    
+    @property
+    def tiempo_sistema_promedio(self) -> float:
+        """Tiempo promedio total en el sistema"""
+        return self.sistema.media
@@ -0,0 +1,131 @@
+"""
+Fuentes aleatorias vectorizadas: llegadas, atributos de clientes y ruido de servicio
+"""
+import random
+from typing import Callable, List
+import numpy as np
+from config import ConfiguracionSimulacion
+from .cliente import Cliente
+
+
+TAM_BLOQUE = 4096
+TAM_BLOQUE_INICIAL = 64  # Los bloques crecen al doble hasta TAM_BLOQUE
+
+
+class RandomAntitetico(random.Random):
+    """`random.Random` que entrega u → 1−u: la corrida antitética de un par
+    
+    expovariate, uniform y demás transformaciones continuas de random()
+    quedan reflejadas; los enteros (getrandbits) no cambian. Consume el
+    mismo estado que la corrida original, así que ambas siguen sincronizadas.
+    """
+    
+    def random(self) -> float:
+        # (1 − u) mod 1 mantiene el rango [0, 1) cuando u = 0
+        return (1.0 - super().random()) % 1.0
+
+
+def uniformes(rng: np.random.Generator, n: int, antitetico: bool = False) -> np.ndarray:
+    """Bloque de uniformes en [0, 1), reflejadas si la corrida es antitética"""
+    u = rng.random(n)
+    if antitetico:
+        return (1.0 - u) % 1.0
+    return u
+
+
+def exponenciales(rng: np.random.Generator, n: int, media: float, antitetico: bool = False) -> np.ndarray:
+    """Exponenciales por inversión (-log(1−u)), para poder reflejar sus uniformes"""
+    return -np.log1p(-uniformes(rng, n, antitetico)) * media
+
+
+class BufferAleatorio:
+    """Reserva de valores aleatorios que se rellena por bloques con NumPy"""
+    
+    def __init__(self, generar: Callable[[int], np.ndarray], tam_bloque: int = TAM_BLOQUE):
+        self._generar = generar
+        self._tam_bloque = tam_bloque
+        self._tam_siguiente = min(TAM_BLOQUE_INICIAL, tam_bloque)
+        self._valores: List = []
+        self._pos = 0
+    
+    def siguiente(self):
+        """Entrega el siguiente valor, generando un bloque nuevo si se agotó"""
+        if self._pos >= len(self._valores):
+            # tolist() convierte a escalares de Python: consumirlos es más barato
+            self._valores = self._generar(self._tam_siguiente).tolist()
+            self._tam_siguiente = min(2 * self._tam_siguiente, self._tam_bloque)
+            self._pos = 0
+        valor = self._valores[self._pos]
+        self._pos += 1
+        return valor
+
+
+class FuenteClientes:
+    """Genera tiempos entre llegadas y clientes a partir de bloques precalculados"""
+    
+    def __init__(
+        self,
+        config: ConfiguracionSimulacion,
+        tasa_llegada: float,
+        rng_llegadas: np.random.Generator,
+        rng_clientes: np.random.Generator,
+        tam_bloque: int = TAM_BLOQUE,
+        antitetico: bool = False
+    ):
+        self._intervalos = BufferAleatorio(
+            lambda n: exponenciales(rng_llegadas, n, 1.0 / tasa_llegada, antitetico), tam_bloque
+        )
+        self._productos = BufferAleatorio(
+            lambda n: rng_clientes.integers(
+                config.productos_cliente_min, config.productos_cliente_max,
+                size=n, endpoint=True
+            ),
+            tam_bloque
+        )
+        minimo, maximo = config.tiempo_abandono_min, config.tiempo_abandono_max
+        self._tolerancias = BufferAleatorio(
+            lambda n: minimo + (maximo - minimo) * uniformes(rng_clientes, n, antitetico),
+            tam_bloque
+        )
+        self._sprites = BufferAleatorio(
+            lambda n: rng_clientes.integers(1, 3, size=n, endpoint=True), tam_bloque
+        )
+    
+    def siguiente_intervalo(self) -> float:
+        """Tiempo hasta la próxima llegada (exponencial)"""
+        return self._intervalos.siguiente()
+    
+    def nuevo_cliente(self, id: int, tiempo_llegada: float) -> Cliente:
+        """Crea un cliente con los siguientes atributos de los bloques"""
+        return Cliente(
+            id=id,
+            tiempo_llegada=tiempo_llegada,
+            num_productos=self._productos.siguiente(),
+            tolerancia_espera=self._tolerancias.siguiente(),
+            sprite_index=self._sprites.siguiente()
+        )
+
+
+class FuenteServicio:
+    """Ruido del tiempo de servicio de una caja, precalculado por bloques"""
+    
+    def __init__(
+        self,
+        rng: np.random.Generator,
+        tam_bloque: int = TAM_BLOQUE,
+        antitetico: bool = False
+    ):
+        self._exponenciales = BufferAleatorio(
+            lambda n: exponenciales(rng, n, 1.0, antitetico), tam_bloque
+        )
+        self._inexperiencia = BufferAleatorio(
+            lambda n: 1.0 + 0.5 * uniformes(rng, n, antitetico), tam_bloque
+        )
+    
+    def exponencial(self, media: float) -> float:
+        """Variable exponencial con la media indicada"""
+        return self._exponenciales.siguiente() * media
+    
+    def factor_inexperiencia(self) -> float:
+        """Factor de lentitud en cajas automáticas (uniforme 1.0–1.5)"""
+        return self._inexperiencia.siguiente()
@@ -0,0 +1,99 @@
+"""
+Índice de cajas por tipo ordenado por longitud de cola
+"""
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from config import TipoCaja
+from .caja import Caja
+from .cliente import Cliente
+
+
+class IndiceCajas:
+    """Un heap por TipoCaja con entradas (longitud_cola, id)
+    
+    Las entradas obsoletas se descartan de forma diferida al consultar el
+    tope, así que cada actualización y cada consulta cuesta O(log n). El
+    desempate por id reproduce el `min` sobre la lista de cajas (en orden de id).
+    """
+    
+    def __init__(self, cajas: List[Caja]):
+        self.cajas = cajas
+        self._por_id: Dict[int, Caja] = {c.id: c for c in cajas}
+        self._longitud: Dict[int, int] = {}
+        self._por_tipo: Dict[TipoCaja, List[Caja]] = {}
+        self._heaps: Dict[TipoCaja, List[Tuple[int, int]]] = {}
+        
+        for caja in cajas:
+            self._por_tipo.setdefault(caja.tipo, []).append(caja)
+        for tipo in self._por_tipo:
+            self._heaps[tipo] = []
+            self._reconstruir(tipo)
+        
+        # Accesos por id para no hashear el Enum en cada actualización
+        self._heap_de: Dict[int, List[Tuple[int, int]]] = {
+            c.id: self._heaps[c.tipo] for c in cajas
+        }
+        self._limite_de: Dict[int, int] = {
+            c.id: 4 * len(self._por_tipo[c.tipo]) + 16 for c in cajas
+        }
+    
+    @classmethod
+    def desde(cls, cajas: Union['IndiceCajas', List[Caja]]) -> 'IndiceCajas':
+        """Devuelve el índice tal cual, o lo construye a partir de una lista de cajas"""
+        if isinstance(cajas, IndiceCajas):
+            return cajas
+        return cls(cajas)
+    
+    def _reconstruir(self, tipo: TipoCaja):
+        """Rehace el heap de un tipo solo con las longitudes vigentes"""
+        heap = []
+        for caja in self._por_tipo[tipo]:
+            longitud = caja.longitud_cola()
+            self._longitud[caja.id] = longitud
+            heap.append((longitud, caja.id))
+        heapq.heapify(heap)
+        self._heaps[tipo][:] = heap
+    
+    def actualizar(self, caja: Caja) -> int:
+        """Registra la longitud actual de la cola de una caja y devuelve el cambio"""
+        longitud = caja.longitud_cola()
+        delta = longitud - self._longitud[caja.id]
+        if delta == 0:
+            return 0
+        
+        self._longitud[caja.id] = longitud
+        heap = self._heap_de[caja.id]
+        heapq.heappush(heap, (longitud, caja.id))
+        
+        # Acotar las entradas obsoletas acumuladas debajo del tope
+        if len(heap) > self._limite_de[caja.id]:
+            self._reconstruir(caja.tipo)
+        return delta
+    
+    def _tope(self, tipo: TipoCaja) -> Optional[Tuple[int, int]]:
+        """Entrada vigente con menor (longitud, id) de un tipo"""
+        heap = self._heaps.get(tipo)
+        if not heap:
+            return None
+        longitudes = self._longitud
+        while heap[0][0] != longitudes[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0]
+    
+    def mas_corta(self, tipos: Iterable[TipoCaja]) -> Optional[Caja]:
+        """Caja con la cola más corta entre los tipos indicados"""
+        mejor = None
+        for tipo in tipos:
+            tope = self._tope(tipo)
+            if tope is not None and (mejor is None or tope < mejor):
+                mejor = tope
+        if mejor is None:
+            return None
+        return self._por_id[mejor[1]]
+    
+    def tipos_validos(self, cliente: Cliente) -> List[TipoCaja]:
+        """Tipos de caja presentes que pueden atender al cliente"""
+        return [
+            tipo for tipo, cajas in self._por_tipo.items()
+            if cajas[0].puede_atender(cliente)
+        ]
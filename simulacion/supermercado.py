@@ -3,65 +3,95 @@ Motor principal de simulación del supermercado usando SimPy
 """
 import simpy
 import random
-from typing import List, Optional, Callable, Dict
+import numpy as np
+from typing import List, Optional, Callable, Dict, Union
 from config import (
     TipoCaja, ConfiguracionSimulacion, ConfiguracionCajas
 )
 from .cliente import Cliente
 from .caja import Caja
-from .estadisticas import EstadisticasSimulacion
+from .estadisticas import EstadisticasSimulacion, EstadisticasStreaming
+from .motor_heap import CajaHeap, MotorHeap
+from .fuente import FuenteClientes, FuenteServicio, RandomAntitetico
+from .indice_cajas import IndiceCajas
+from .colas import ColaClientes
+
+
+# Motores de simulación disponibles: SimPy (visualización) y heapq (lotes)
+MOTORES = ("simpy", "heap")
+
+# Muestreo aleatorio: llamadas escalares a `random` o bloques NumPy precalculados
+MUESTREOS = ("escalar", "bloques")
+
+# Versión de la lógica de simulación: subirla cuando cambien los resultados de
+# una misma semilla (invalida la caché de réplicas en disco)
+VERSION_MOTOR = "1"
+
+# Estadísticas: registros por cliente o acumuladores de memoria acotada
+MODOS_ESTADISTICAS = {
+    "completas": EstadisticasSimulacion,
+    "streaming": EstadisticasStreaming,
+}
+
+
+def _flujo_escalar(semilla: np.random.SeedSequence, antitetico: bool = False) -> random.Random:
+    """Generador `random.Random` independiente derivado de una SeedSequence"""
+    clase = RandomAntitetico if antitetico else random.Random
+    return clase(int.from_bytes(semilla.generate_state(4).tobytes(), 'little'))
 
 
 class PoliticaAsignacion:
-    """Políticas de asignación de clientes a cajas"""
+    """Políticas de asignación de clientes a cajas
+    
+    Reciben la lista de cajas o un IndiceCajas; con el índice cada consulta
+    es O(log n) en lugar de recorrer todas las cajas.
+    """
     
     @staticmethod
-    def cola_mas_corta(cajas: List[Caja], cliente: Cliente) -> Optional[Caja]:
+    def cola_mas_corta(cajas: Union[IndiceCajas, List[Caja]], cliente: Cliente) -> Optional[Caja]:
         """Asigna a la caja con cola más corta que pueda atender"""
-        cajas_validas = [c for c in cajas if c.puede_atender(cliente)]
-        if not cajas_validas:
-            return None
-        return min(cajas_validas, key=lambda c: c.longitud_cola())
+        indice = IndiceCajas.desde(cajas)
+        return indice.mas_corta(indice.tipos_validos(cliente))
     
     @staticmethod
-    def prioridad_rapida(cajas: List[Caja], cliente: Cliente, max_productos: int = 10) -> Optional[Caja]:
+    def prioridad_rapida(cajas: Union[IndiceCajas, List[Caja]], cliente: Cliente, max_productos: int = 10) -> Optional[Caja]:
         """Prioriza cajas rápidas para clientes con pocos productos"""
+        indice = IndiceCajas.desde(cajas)
         if cliente.puede_usar_caja_rapida(max_productos):
-            cajas_rapidas = [c for c in cajas if c.tipo == TipoCaja.RAPIDA]
-            if cajas_rapidas:
-                mejor = min(cajas_rapidas, key=lambda c: c.longitud_cola())
-                # Solo usar rápida si la cola no es muy larga
-                if mejor.longitud_cola() <= 3:
-                    return mejor
+            mejor = indice.mas_corta([TipoCaja.RAPIDA])
+            # Solo usar rápida si la cola no es muy larga
+            if mejor is not None and mejor.longitud_cola() <= 3:
+                return mejor
         
         # Fallback a cola más corta
-        return PoliticaAsignacion.cola_mas_corta(cajas, cliente)
+        return PoliticaAsignacion.cola_mas_corta(indice, cliente)
     
     @staticmethod
-    def preferir_humana(cajas: List[Caja], cliente: Cliente) -> Optional[Caja]:
+    def preferir_humana(cajas: Union[IndiceCajas, List[Caja]], cliente: Cliente) -> Optional[Caja]:
         """Clientes con muchos productos prefieren cajas humanas"""
+        indice = IndiceCajas.desde(cajas)
         if cliente.num_productos > 20:
-            cajas_humanas = [c for c in cajas if c.tipo == TipoCaja.HUMANA]
-            if cajas_humanas:
-                mejor = min(cajas_humanas, key=lambda c: c.longitud_cola())
-                if mejor.longitud_cola() <= 5:
-                    return mejor
+            mejor = indice.mas_corta([TipoCaja.HUMANA])
+            if mejor is not None and mejor.longitud_cola() <= 5:
+                return mejor
         
-        return PoliticaAsignacion.cola_mas_corta(cajas, cliente)
+        return PoliticaAsignacion.cola_mas_corta(indice, cliente)
     
     @staticmethod
-    def balanceada(cajas: List[Caja], cliente: Cliente) -> Optional[Caja]:
+    def balanceada(cajas: Union[IndiceCajas, List[Caja]], cliente: Cliente) -> Optional[Caja]:
         """Política balanceada considerando tipo de cliente y caja"""
+        indice = IndiceCajas.desde(cajas)
+        
         # Clientes con ≤10 productos → priorizar rápidas
         if cliente.num_productos <= 10:
-            return PoliticaAsignacion.prioridad_rapida(cajas, cliente)
+            return PoliticaAsignacion.prioridad_rapida(indice, cliente)
         
         # Clientes con muchos productos → preferir humanas
         if cliente.num_productos > 25:
-            return PoliticaAsignacion.preferir_humana(cajas, cliente)
+            return PoliticaAsignacion.preferir_humana(indice, cliente)
         
         # Resto → cola más corta
-        return PoliticaAsignacion.cola_mas_corta(cajas, cliente)
+        return PoliticaAsignacion.cola_mas_corta(indice, cliente)
 
 
 class Supermercado:
@@ -72,23 +102,49 @@ class Supermercado:
         config_sim: ConfiguracionSimulacion = None,
         config_cajas: ConfiguracionCajas = None,
         politica: str = "balanceada",
-        alta_demanda: bool = False
+        alta_demanda: bool = False,
+        semilla: Optional[int] = None,
+        motor: str = "simpy",
+        muestreo: str = "escalar",
+        modo_estadisticas: str = "completas",
+        antitetico: bool = False
     ):
+        if motor not in MOTORES:
+            raise ValueError(f"Motor desconocido: {motor} (opciones: {', '.join(MOTORES)})")
+        if muestreo not in MUESTREOS:
+            raise ValueError(f"Muestreo desconocido: {muestreo} (opciones: {', '.join(MUESTREOS)})")
+        if modo_estadisticas not in MODOS_ESTADISTICAS:
+            raise ValueError(
+                f"Modo de estadísticas desconocido: {modo_estadisticas} "
+                f"(opciones: {', '.join(MODOS_ESTADISTICAS)})"
+            )
+        
         self.config_sim = config_sim or ConfiguracionSimulacion()
         self.config_cajas = config_cajas or ConfiguracionCajas()
         self.alta_demanda = alta_demanda
+        self.semilla = semilla
+        self.motor = motor
+        self.muestreo = muestreo
+        self.modo_estadisticas = modo_estadisticas
+        self.antitetico = antitetico  # Reflejar las uniformes (u → 1−u) de todos los flujos
         
         # Seleccionar política
         self.politica = self._seleccionar_politica(politica)
         self.nombre_politica = politica
         
-        # SimPy environment
+        # SimPy environment (o MotorHeap, que expone la misma interfaz now/run)
         self.env: Optional[simpy.Environment] = None
         
         # Componentes
         self.cajas: List[Caja] = []
-        self.clientes_en_sistema: List[Cliente] = []
-        self.estadisticas = EstadisticasSimulacion()
+        self.indice_cajas: Optional[IndiceCajas] = None
+        self.clientes_en_sistema = ColaClientes()
+        self.estadisticas = self._nuevas_estadisticas()
+        self.fuente_clientes: Optional[FuenteClientes] = None
+        
+        # Flujos aleatorios propios (muestreo escalar)
+        self.rng_llegadas = random.Random()
+        self.rng_clientes = random.Random()
         
         # Control
         self._cliente_id = 0
@@ -112,6 +168,10 @@ class Supermercado:
         }
         return politicas.get(nombre, PoliticaAsignacion.balanceada)
     
+    def _nuevas_estadisticas(self) -> EstadisticasSimulacion:
+        """Recolector de estadísticas según el modo elegido"""
+        return MODOS_ESTADISTICAS[self.modo_estadisticas]()
+    
     @property
     def tasa_llegada(self) -> float:
         """Tasa de llegada según demanda"""
@@ -123,44 +183,117 @@ class Supermercado:
         """Inicializa las cajas según configuración"""
         self.cajas = []
         caja_id = 0
+        clase_caja = CajaHeap if self.motor == "heap" else Caja
         
         # Cajas humanas
         for _ in range(self.config_cajas.cajas_humanas):
-            caja = Caja(self.env, caja_id, TipoCaja.HUMANA, self.config_sim)
+            caja = clase_caja(self.env, caja_id, TipoCaja.HUMANA, self.config_sim)
             self.cajas.append(caja)
             caja_id += 1
         
         # Cajas automáticas
         for _ in range(self.config_cajas.cajas_automaticas):
-            caja = Caja(self.env, caja_id, TipoCaja.AUTOMATICA, self.config_sim)
+            caja = clase_caja(self.env, caja_id, TipoCaja.AUTOMATICA, self.config_sim)
             self.cajas.append(caja)
             caja_id += 1
         
         # Cajas rápidas
         for _ in range(self.config_cajas.cajas_rapidas):
-            caja = Caja(self.env, caja_id, TipoCaja.RAPIDA, self.config_sim)
+            caja = clase_caja(self.env, caja_id, TipoCaja.RAPIDA, self.config_sim)
             self.cajas.append(caja)
             caja_id += 1
+        
+        self.indice_cajas = IndiceCajas(self.cajas)
+    
+    def _crear_fuentes(self):
+        """Prepara flujos aleatorios independientes: llegadas, clientes y uno por caja
+        
+        Todos se derivan de la semilla con SeedSequence; el servicio de la
+        i-ésima caja de cada tipo usa siempre el mismo flujo. Así, escenarios
+        corridos con la misma semilla ven los mismos clientes llegar en los
+        mismos instantes (números aleatorios comunes) y sus diferencias no se
+        mezclan con ruido de muestreo. Con `antitetico` los flujos reflejan sus
+        uniformes, para formar pares antitéticos con la corrida normal.
+        """
+        tipos = list(TipoCaja)
+        raiz = np.random.SeedSequence(self.semilla)
+        semilla_llegadas, semilla_clientes, *semillas_tipo = raiz.spawn(2 + len(tipos))
+        
+        por_tipo = {tipo: [c for c in self.cajas if c.tipo == tipo] for tipo in tipos}
+        semillas_caja = []
+        for tipo, semilla_tipo in zip(tipos, semillas_tipo):
+            cajas = por_tipo[tipo]
+            semillas_caja.extend(zip(cajas, semilla_tipo.spawn(len(cajas))))
+        
+        if self.muestreo == "bloques":
+            self.fuente_clientes = FuenteClientes(
+                self.config_sim, self.tasa_llegada,
+                np.random.default_rng(semilla_llegadas),
+                np.random.default_rng(semilla_clientes),
+                antitetico=self.antitetico
+            )
+            for caja, semilla in semillas_caja:
+                caja.fuente_servicio = FuenteServicio(
+                    np.random.default_rng(semilla), antitetico=self.antitetico
+                )
+        else:
+            self.fuente_clientes = None
+            self.rng_llegadas = _flujo_escalar(semilla_llegadas, self.antitetico)
+            self.rng_clientes = _flujo_escalar(semilla_clientes, self.antitetico)
+            for caja, semilla in semillas_caja:
+                caja.rng = _flujo_escalar(semilla, self.antitetico)
+    
+    def _siguiente_intervalo(self) -> float:
+        """Tiempo hasta la próxima llegada"""
+        if self.fuente_clientes is not None:
+            intervalo = self.fuente_clientes.siguiente_intervalo()
+        else:
+            intervalo = self.rng_llegadas.expovariate(self.tasa_llegada)
+        self.estadisticas.entradas.registrar_intervalo(intervalo)
+        return intervalo
+    
+    def _nuevo_cliente(self) -> Cliente:
+        """Crea el siguiente cliente que llega en el instante actual"""
+        self._cliente_id += 1
+        if self.fuente_clientes is not None:
+            cliente = self.fuente_clientes.nuevo_cliente(self._cliente_id, self.env.now)
+        else:
+            cliente = Cliente.generar(
+                self._cliente_id, self.env.now, self.config_sim, self.rng_clientes
+            )
+        self.estadisticas.entradas.registrar_cliente(cliente)
+        return cliente
+    
+    def _entrar_sistema(self, cliente: Cliente):
+        """Registra la llegada de un cliente al sistema"""
+        self.clientes_en_sistema.append(cliente)
+        self.estadisticas.registrar_cambio_sistema(self.env.now, 1)
+    
+    def _salir_sistema(self, cliente: Cliente):
+        """Registra la salida de un cliente del sistema"""
+        self.clientes_en_sistema.remove(cliente)
+        self.estadisticas.registrar_cambio_sistema(self.env.now, -1)
+    
+    def _actualizar_cola(self, caja: Caja):
+        """Actualiza el índice de cajas y, si cambió, la serie de colas"""
+        delta = self.indice_cajas.actualizar(caja)
+        if delta:
+            self.estadisticas.registrar_cambio_cola(self.env.now, delta)
     
     def _proceso_llegada_clientes(self):
         """Proceso SimPy: genera llegadas de clientes (Poisson)"""
         while self._running:
             # Tiempo entre llegadas: exponencial (inverso de Poisson)
-            tiempo_entre_llegadas = random.expovariate(self.tasa_llegada)
+            tiempo_entre_llegadas = self._siguiente_intervalo()
             yield self.env.timeout(tiempo_entre_llegadas)
             
             if not self._running:
                 break
             
             # Crear cliente
-            self._cliente_id += 1
-            cliente = Cliente.generar(
-                self._cliente_id,
-                self.env.now,
-                self.config_sim
-            )
+            cliente = self._nuevo_cliente()
             
-            self.clientes_en_sistema.append(cliente)
+            self._entrar_sistema(cliente)
             
             if self.on_cliente_llega:
                 self.on_cliente_llega(cliente)
@@ -171,13 +304,13 @@ class Supermercado:
     def _proceso_cliente(self, cliente: Cliente):
         """Proceso SimPy: cliente busca caja y es atendido"""
         # Seleccionar caja según política
-        caja = self.politica(self.cajas, cliente)
+        caja = self.politica(self.indice_cajas, cliente)
         
         if caja is None:
             # No hay caja disponible (no debería pasar normalmente)
             cliente.abandono = True
             self.estadisticas.registrar_cliente(cliente)
-            self.clientes_en_sistema.remove(cliente)
+            self._salir_sistema(cliente)
             return
         
         cliente.caja_asignada = caja.id
@@ -192,9 +325,15 @@ class Supermercado:
         
         # Proceso de espera y posible abandono
         with caja.recurso.request() as req:
+            # Si la caja está ocupada la solicitud quedó en su cola
+            self._actualizar_cola(caja)
+            
             # Esperar turno o abandonar
             resultado = yield req | self.env.timeout(cliente.tolerancia_espera)
             
+            # Si obtuvo la caja, SimPy ya lo sacó de la cola
+            self._actualizar_cola(caja)
+            
             if req not in resultado:
                 # El cliente abandonó
                 cliente.abandono = True
@@ -204,67 +343,77 @@ class Supermercado:
                 self.estadisticas.registrar_cliente(cliente, caja.tipo, caja.id)
                 
                 if cliente in self.clientes_en_sistema:
-                    self.clientes_en_sistema.remove(cliente)
+                    self._salir_sistema(cliente)
                 
                 if self.on_cliente_abandona:
                     self.on_cliente_abandona(cliente, caja)
-                return
-            
-            # Iniciar servicio
-            cliente.tiempo_inicio_servicio = self.env.now
-            if cliente in caja.cola_visual:
-                caja.cola_visual.remove(cliente)
-            caja.cliente_actual = cliente
-            caja.registrar_inicio_servicio()
-            
-            # Tiempo de servicio
-            tiempo_servicio = caja.calcular_tiempo_servicio(cliente)
-            yield self.env.timeout(tiempo_servicio)
-            
-            # Fin del servicio
-            cliente.tiempo_fin_servicio = self.env.now
-            caja.cliente_actual = None
-            caja.registrar_fin_servicio(tiempo_servicio)
-            
-            self.estadisticas.registrar_cliente(cliente, caja.tipo, caja.id)
-            
-            if cliente in self.clientes_en_sistema:
-                self.clientes_en_sistema.remove(cliente)
-            
-            if self.on_cliente_atendido:
-                self.on_cliente_atendido(cliente, caja)
+            else:
+                # Iniciar servicio
+                cliente.tiempo_inicio_servicio = self.env.now
+                if cliente in caja.cola_visual:
+                    caja.cola_visual.remove(cliente)
+                caja.cliente_actual = cliente
+                caja.registrar_inicio_servicio()
+                
+                # Tiempo de servicio
+                tiempo_servicio = caja.calcular_tiempo_servicio(cliente)
+                yield self.env.timeout(tiempo_servicio)
+                
+                # Fin del servicio
+                cliente.tiempo_fin_servicio = self.env.now
+                caja.cliente_actual = None
+                caja.registrar_fin_servicio(tiempo_servicio)
+                
+                self.estadisticas.registrar_cliente(cliente, caja.tipo, caja.id)
+                
+                if cliente in self.clientes_en_sistema:
+                    self._salir_sistema(cliente)
+                
+                if self.on_cliente_atendido:
+                    self.on_cliente_atendido(cliente, caja)
+        
+        # Al salir del bloque un abandono cancela su solicitud y deja la cola
+        self._actualizar_cola(caja)
     
     def _proceso_monitoreo(self):
-        """Proceso SimPy: monitorea estado cada cierto tiempo"""
+        """Proceso SimPy: avisa a la visualización cada cierto tiempo"""
         intervalo = 1.0  # Cada minuto
         while self._running:
             yield self.env.timeout(intervalo)
-            
-            # Registrar longitud de colas
-            total_cola = sum(c.longitud_cola() for c in self.cajas)
-            self.estadisticas.registrar_estado_cola(self.env.now, total_cola)
-            
-            # Calcular throughput instantáneo
-            if self.env.now > 0:
-                horas = self.env.now / 60.0
-                throughput = self.estadisticas.clientes_atendidos / horas
-                self.estadisticas.registrar_throughput(self.env.now, throughput)
-            
-            if self.on_tick:
-                self.on_tick(self.env.now)
+            self._registrar_monitoreo()
+    
+    def _registrar_monitoreo(self):
+        """Notifica el instante actual a la visualización
+        
+        Colas, clientes en sistema y throughput ya se registran en cada cambio
+        de estado (ver EstadisticasSimulacion.muestrear_cola).
+        """
+        self.estadisticas.tiempo_final = self.env.now
+        if self.on_tick:
+            self.on_tick(self.env.now)
     
     def iniciar(self):
         """Inicializa la simulación"""
-        self.env = simpy.Environment()
+        if self.motor == "heap":
+            self.env = MotorHeap(self)
+        else:
+            self.env = simpy.Environment()
         self._crear_cajas()
+        self._crear_fuentes()
         self._running = True
         self._cliente_id = 0
-        self.clientes_en_sistema = []
-        self.estadisticas = EstadisticasSimulacion()
+        self.clientes_en_sistema = ColaClientes()
+        self.estadisticas = self._nuevas_estadisticas()
+        for caja in self.cajas:
+            caja.entradas = self.estadisticas.entradas
         
         # Iniciar procesos
-        self.env.process(self._proceso_llegada_clientes())
-        self.env.process(self._proceso_monitoreo())
+        if self.motor == "heap":
+            self.env.iniciar()
+        else:
+            self.env.process(self._proceso_llegada_clientes())
+            if self.on_tick:
+                self.env.process(self._proceso_monitoreo())
     
     def ejecutar(self, duracion: float = None):
         """Ejecuta la simulación completa"""
@@ -274,6 +423,7 @@ class Supermercado:
         self.iniciar()
         self.env.run(until=duracion)
         self._running = False
+        self.estadisticas.tiempo_final = self.env.now
         
         return self.estadisticas
     
@@ -281,6 +431,7 @@ class Supermercado:
         """Avanza la simulación un paso (para visualización)"""
         if self.env and self._running and not self._paused:
             self.env.run(until=self.env.now + delta)
+            self.estadisticas.tiempo_final = self.env.now
     
     def pausar(self):
         """Pausa la simulación"""